@@ -0,0 +1,181 @@
+"""
+Admission control and request deadlines.
+
+`AdmissionMiddleware` caps concurrent requests per worker: once `ADMISSION_MAX_IN_FLIGHT`
+are running, new ones wait for a slot for at most `ADMISSION_MAX_QUEUE_WAIT_MS`, and are
+shed with 503 + Retry-After when the wait queue is full or the wait runs out.
+
+Admitted requests run under `pymongo.timeout()`, so every Mongo operation they issue
+is sent with a maxTimeMS equal to what is left of the request's deadline. Motor copies
+the context into its executor threads, which is what carries the deadline across.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import pymongo
+from fastapi import HTTPException, Request, status
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+
+from .config import settings
+from .utils import match_route, parse_route_map
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+
+# Long-lived or operator-only paths that must keep working when the API is overloaded
+EXEMPT_PREFIXES = ("/events", "/admin")
+
+
+ROUTE_TIMEOUTS = parse_route_map(settings.route_timeouts_ms)
+
+
+def request_timeout(scope) -> float:
+    """The route's default deadline in seconds, or the client's X-Request-Timeout-Ms within the cap."""
+    route_ms = match_route(ROUTE_TIMEOUTS, scope["method"], scope["path"])
+    timeout = float(route_ms or settings.request_timeout_ms) / 1000
+    for name, value in scope.get("headers", []):
+        if name == TIMEOUT_HEADER:
+            try:
+                timeout = float(value) / 1000
+            except ValueError:
+                pass
+            break
+    return min(max(timeout, 0.001), settings.request_timeout_max_ms / 1000)
+
+
+def is_timeout(exc: Optional[BaseException]) -> bool:
+    return isinstance(exc, PyMongoError) and exc.timeout
+
+
+class Admission:
+    def __init__(self, max_in_flight: int, max_queue: int, max_queue_wait: float) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self.queued = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._max_wait = 0.0
+        self._counters = {
+            "admitted": 0,
+            "shed_queue_full": 0,
+            "shed_queue_wait": 0,
+            "deadline_exceeded": 0,
+        }
+
+    async def acquire(self, deadline: float) -> bool:
+        """Take a slot, waiting in line if needed. False means the request should be shed."""
+        if not self._slots.locked():
+            await self._slots.acquire()
+        elif self.queued >= self.max_queue:
+            self._counters["shed_queue_full"] += 1
+            return False
+        else:
+            wait = min(self.max_queue_wait, deadline - time.monotonic())
+            started = time.monotonic()
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=max(wait, 0))
+            except asyncio.TimeoutError:
+                self._counters["shed_queue_wait"] += 1
+                return False
+            finally:
+                self.queued -= 1
+                self._max_wait = max(self._max_wait, time.monotonic() - started)
+        self.in_flight += 1
+        self._counters["admitted"] += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def deadline_exceeded(self) -> None:
+        self._counters["deadline_exceeded"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "max_queue_wait_seconds": round(self._max_wait, 3),
+            **self._counters,
+        }
+
+
+admission = Admission(
+    max_in_flight=settings.admission_max_in_flight,
+    max_queue=settings.admission_max_queue,
+    max_queue_wait=settings.admission_max_queue_wait_ms / 1000,
+)
+
+
+class AdmissionMiddleware:
+    """Sheds load with 503 before it piles up, and bounds admitted requests by a deadline."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        deadline = time.monotonic() + request_timeout(scope)
+        if not await admission.acquire(deadline):
+            await self._shed(send)
+            return
+        try:
+            # Time spent waiting for a slot counts against the deadline
+            with pymongo.timeout(max(deadline - time.monotonic(), 0.001)):
+                await self.app(scope, receive, send)
+        finally:
+            admission.release()
+
+    @staticmethod
+    async def _shed(send) -> None:
+        body = json.dumps({"detail": "Server is busy, try again shortly"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.admission_retry_after_seconds).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _deadline_response() -> JSONResponse:
+    admission.deadline_exceeded()
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT, content={"detail": "Request deadline exceeded"}
+    )
+
+
+async def deadline_http_exception_handler(request: Request, exc: HTTPException):
+    # Routes wrap unexpected errors in a 500 `from exc`; a Mongo timeout underneath is a 504
+    if exc.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR and is_timeout(exc.__cause__):
+        return _deadline_response()
+    return await http_exception_handler(request, exc)
+
+
+async def mongo_error_handler(request: Request, exc: PyMongoError):
+    if is_timeout(exc):
+        return _deadline_response()
+    # Anything else Mongo raised outside a route's own handling: log it, answer generically
+    logger.error("Unhandled Mongo error on %s %s", request.method, request.url.path, exc_info=exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Database unavailable"}
+    )
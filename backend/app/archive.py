@@ -0,0 +1,101 @@
+"""
+Hot/cold split for settled orders.
+
+Orders that are delivered and paid out never change again, so the `archive_orders` job
+moves them (and their chats) to `orders_archive` / `chats_archive` in batches. That
+keeps the `orders` indexes and working set down to orders that are still in progress.
+Every batch is copied before it is deleted and the copies are upserts, so a run that
+dies halfway is finished by the next one. Chats only move once their order has
+actually left `orders`; messages a dead run left behind stay readable because chat
+listings merge both collections.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReplaceOne
+
+from .config import settings
+from .jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+SETTLED = {"status": "delivered", "payout_status": "PAID"}
+
+last_run: Dict[str, Any] = {}
+
+
+async def _copy(db: AsyncIOMotorDatabase, collection: str, docs: List[Dict[str, Any]]) -> None:
+    if docs:
+        await db[collection].bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False
+        )
+
+
+async def archive_batch(
+    db: AsyncIOMotorDatabase, cutoff: datetime, batch_size: int, chats: bool
+) -> Tuple[int, int]:
+    """Returns (orders read, orders archived); the rest changed since the read and stay hot."""
+    orders = await db.orders.find({**SETTLED, "created_at": {"$lt": cutoff}}).limit(batch_size).to_list(length=None)
+    if not orders:
+        return 0, 0
+    ids = [order["_id"] for order in orders]
+
+    await _copy(db, "orders_archive", orders)
+    # Re-check the filter so an order touched since the read stays hot
+    await db.orders.delete_many({"_id": {"$in": ids}, **SETTLED})
+    remaining = await db.orders.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(length=None)
+    still_hot = {order["_id"] for order in remaining}
+    if still_hot:
+        # Their archive copies are stale and would be listed twice with include_archived
+        await db.orders_archive.delete_many({"_id": {"$in": list(still_hot)}})
+    moved = [oid for oid in ids if oid not in still_hot]
+
+    if chats and moved:
+        messages = await db.chats.find({"order_id": {"$in": moved}}).to_list(length=None)
+        await _copy(db, "chats_archive", messages)
+        await db.chats.delete_many({"_id": {"$in": [message["_id"] for message in messages]}})
+    return len(orders), len(moved)
+
+
+@job_queue.handler("archive_orders")
+async def archive_orders(
+    db: AsyncIOMotorDatabase,
+    min_age_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Move settled orders older than `min_age_days` to the archive, one batch at a time."""
+    min_age_days = settings.archive_min_age_days if min_age_days is None else min_age_days
+    batch_size = batch_size or settings.archive_batch_size
+    max_batches = max_batches or settings.archive_max_batches
+    chats = settings.archive_chats
+
+    await db.orders_archive.create_index([("requester_id", ASCENDING), ("created_at", ASCENDING)])
+    if chats:
+        await db.chats_archive.create_index([("order_id", ASCENDING), ("created_at", ASCENDING)])
+
+    started = datetime.utcnow()
+    cutoff = started - timedelta(days=min_age_days)
+    archived = batches = 0
+    while batches < max_batches:
+        read, moved = await archive_batch(db, cutoff, batch_size, chats)
+        if not read:
+            break
+        archived += moved
+        batches += 1
+
+    last_run.clear()
+    last_run.update(
+        {
+            "started_at": started,
+            "seconds": round((datetime.utcnow() - started).total_seconds(), 3),
+            "archived_orders": archived,
+            "batches": batches,
+            "cutoff": cutoff,
+        }
+    )
+    logger.info("Archived %s settled orders in %s batches", archived, batches)
+    return last_run
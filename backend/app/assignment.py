@@ -0,0 +1,337 @@
+"""
+Batch auto-assignment of open orders to fetchers.
+
+On every tick the scheduler loads all open orders and offers and matches each order to
+at most one fetcher (one order per fetcher per tick). A pair is only eligible when the
+offer's destination is the order's dropoff location, or the order targets that fetcher
+or offer. Among eligible pairs the score prefers targeted fetchers/offers and cheaper
+delivery charges.
+
+Small batches are solved optimally with the Hungarian algorithm. Large ones use a greedy
+pass over location buckets that is O(n log n): oldest orders first, cheapest free
+fetcher heading to the same place. Assignments are committed with the same guard as
+`accept_order` (the order must still be open), so a manual accept always wins a race.
+
+A tick takes the oldest ASSIGN_MAX_ORDERS open orders and the newest ASSIGN_MAX_OFFERS
+offers posted in the last ASSIGN_OFFER_MAX_AGE_HOURS.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from .config import settings
+from .events import publish_order_event
+from .order_log import order_log
+from .participants import update_participants_many
+from .projections import OFFER_ASSIGNMENT, ORDER_ASSIGNMENT, ORDER_SUMMARY
+from .repositories import Repositories
+from .utils import order_to_public
+
+logger = logging.getLogger(__name__)
+
+LOCATION_WEIGHT = 10.0
+TARGET_FETCHER_WEIGHT = 20.0
+TARGET_OFFER_WEIGHT = 5.0
+CHARGE_WEIGHT = 2.0
+
+Pair = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def location_key(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def eligible(order: Dict[str, Any], offer: Dict[str, Any]) -> bool:
+    if order["requester_id"] == offer["fetcher_id"]:
+        return False
+    if order.get("target_fetcher_id"):
+        return order["target_fetcher_id"] == offer["fetcher_id"]
+    return (
+        order.get("target_offer_id") == offer["_id"]
+        or location_key(order.get("dropoff_location")) == location_key(offer.get("destination"))
+    )
+
+
+def score(order: Dict[str, Any], offer: Dict[str, Any], max_charge: float) -> float:
+    value = 0.0
+    if location_key(order.get("dropoff_location")) == location_key(offer.get("destination")):
+        value += LOCATION_WEIGHT
+    if order.get("target_fetcher_id") == offer["fetcher_id"]:
+        value += TARGET_FETCHER_WEIGHT
+    if order.get("target_offer_id") == offer["_id"]:
+        value += TARGET_OFFER_WEIGHT
+    return value - CHARGE_WEIGHT * (offer.get("delivery_charge") or 0) / max_charge
+
+
+def _max_charge(offers: List[Dict[str, Any]]) -> float:
+    return max((offer.get("delivery_charge") or 0 for offer in offers), default=0) or 1.0
+
+
+def solve_greedy(orders: List[Dict[str, Any]], offers: List[Dict[str, Any]]) -> List[Pair]:
+    max_charge = _max_charge(offers)
+    by_fetcher: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    by_id = {offer["_id"]: offer for offer in offers}
+    buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for offer in offers:
+        by_fetcher[offer["fetcher_id"]].append(offer)
+        buckets[location_key(offer.get("destination"))].append(offer)
+    for bucket in buckets.values():
+        bucket.sort(key=lambda offer: offer.get("delivery_charge") or 0)
+
+    busy = set()
+    pairs: List[Pair] = []
+
+    def take(order, candidates) -> bool:
+        best = max(
+            (offer for offer in candidates if offer["fetcher_id"] not in busy and eligible(order, offer)),
+            key=lambda offer: score(order, offer, max_charge),
+            default=None,
+        )
+        if best is None:
+            return False
+        busy.add(best["fetcher_id"])
+        pairs.append((order, best))
+        return True
+
+    orders = sorted(orders, key=lambda order: order["created_at"])
+    # Targeted orders can only go to one fetcher, so they claim it before anyone else
+    rest = []
+    for order in orders:
+        if order.get("target_fetcher_id"):
+            take(order, by_fetcher.get(order["target_fetcher_id"], ()))
+        elif order.get("target_offer_id") in by_id and take(order, [by_id[order["target_offer_id"]]]):
+            continue
+        else:
+            rest.append(order)
+
+    # Within a bucket every offer matches on location, so cheapest free fetcher wins.
+    # `start` skips the busy prefix so each bucket is walked about once overall.
+    start: Dict[str, int] = defaultdict(int)
+    for order in rest:
+        key = location_key(order.get("dropoff_location"))
+        bucket = buckets.get(key)
+        if not bucket:
+            continue
+        while start[key] < len(bucket) and bucket[start[key]]["fetcher_id"] in busy:
+            start[key] += 1
+        for offer in bucket[start[key]:]:
+            if offer["fetcher_id"] not in busy and offer["fetcher_id"] != order["requester_id"]:
+                busy.add(offer["fetcher_id"])
+                pairs.append((order, offer))
+                break
+    return pairs
+
+
+def hungarian(weights: List[List[Optional[float]]]) -> List[Tuple[int, int]]:
+    """
+    Maximum-weight assignment for an n x m matrix with n <= m; None marks a forbidden
+    pair. Returns (row, col) pairs, leaving rows unmatched rather than forcing a
+    forbidden pair. Classic O(n^2 m) potentials method.
+    """
+    n = len(weights)
+    m = len(weights[0]) if n else 0
+    if not n or not m:
+        return []
+    allowed = [w for row in weights for w in row if w is not None]
+    top = max(allowed, default=0.0)
+    # Costly enough that one forbidden pair outweighs any mix of allowed ones, so the
+    # number of real matches is maximized first and their total weight second
+    forbidden = (top - min(allowed, default=0.0) + 1) * (n + 1)
+    cost = [[top - w if w is not None else forbidden for w in row] for row in weights]
+
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1)  # match[col] = row, 1-based
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        col0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            delta = inf
+            col1 = 0
+            for col in range(1, m + 1):
+                if not used[col]:
+                    cur = cost[row0 - 1][col - 1] - u[row0] - v[col]
+                    if cur < minv[col]:
+                        minv[col] = cur
+                        way[col] = col0
+                    if minv[col] < delta:
+                        delta = minv[col]
+                        col1 = col
+            for col in range(m + 1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    minv[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+    return [
+        (match[col] - 1, col - 1)
+        for col in range(1, m + 1)
+        if match[col] and weights[match[col] - 1][col - 1] is not None
+    ]
+
+
+def solve_optimal(orders: List[Dict[str, Any]], offers: List[Dict[str, Any]]) -> List[Pair]:
+    max_charge = _max_charge(offers)
+    # One column per fetcher, worth their best offer for that order
+    fetchers: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for offer in offers:
+        fetchers[offer["fetcher_id"]].append(offer)
+    columns = list(fetchers.values())
+
+    best: List[List[Optional[Tuple[float, Dict[str, Any]]]]] = []
+    for order in orders:
+        row = []
+        for candidates in columns:
+            scored = [(score(order, offer, max_charge), offer) for offer in candidates if eligible(order, offer)]
+            row.append(max(scored, key=lambda item: item[0]) if scored else None)
+        best.append(row)
+
+    transpose = len(orders) > len(columns)
+    weights = [[cell[0] if cell else None for cell in row] for row in best]
+    if transpose:
+        weights = [list(col) for col in zip(*weights)]
+    pairs = []
+    for i, j in hungarian(weights):
+        row, col = (j, i) if transpose else (i, j)
+        pairs.append((orders[row], best[row][col][1]))
+    return pairs
+
+
+def solve(orders: List[Dict[str, Any]], offers: List[Dict[str, Any]]) -> Tuple[str, List[Pair]]:
+    fetchers = len({offer["fetcher_id"] for offer in offers})
+    if len(orders) * fetchers <= settings.assign_optimal_max_pairs:
+        return "hungarian", solve_optimal(orders, offers)
+    return "greedy", solve_greedy(orders, offers)
+
+
+class AssignmentScheduler:
+    """
+    Runs one assignment tick every ASSIGN_INTERVAL_SECONDS. Only the worker holding the
+    `assignment` lease in `locks` solves, so uvicorn workers don't hand out the same
+    fetcher twice.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.holder = uuid.uuid4().hex
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._repos: Optional[Repositories] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_tick: Dict[str, Any] = {}
+        self._counters = {"ticks": 0, "assigned": 0, "conflicts": 0, "errors": 0}
+
+    def start(self, db: AsyncIOMotorDatabase, repos: Repositories) -> None:
+        # The lease lives in `locks` next to the jobs; orders and offers go through repos
+        self._db = db
+        self._repos = repos
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _lease(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self._db.locks.find_one_and_update(
+                {"_id": "assignment", "$or": [{"holder": self.holder}, {"until": {"$lt": now}}]},
+                {"$set": {"holder": self.holder, "until": now + timedelta(seconds=self.interval * 3)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Someone else holds an unexpired lease
+            return False
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if await self._lease():
+                    await self.tick(self._repos)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._counters["errors"] += 1
+                logger.exception("Assignment tick failed")
+
+    async def tick(self, repos: Repositories) -> Dict[str, Any]:
+        started = time.perf_counter()
+        orders = await repos.orders.open_for_assignment(ORDER_ASSIGNMENT, settings.assign_max_orders)
+        since = datetime.utcnow() - timedelta(hours=settings.assign_offer_max_age_hours)
+        offers = await repos.offers.posted_since(since, OFFER_ASSIGNMENT, settings.assign_max_offers)
+        loaded = time.perf_counter()
+
+        algorithm, pairs = solve(orders, offers)
+        solved = time.perf_counter()
+
+        assigned = await self._commit(repos, pairs)
+        self._counters["ticks"] += 1
+        self._counters["assigned"] += assigned
+        self._counters["conflicts"] += len(pairs) - assigned
+        self.last_tick = {
+            "at": datetime.utcnow(),
+            "algorithm": algorithm,
+            "orders": len(orders),
+            "offers": len(offers),
+            "matched": len(pairs),
+            "assigned": assigned,
+            "match_rate": round(len(pairs) / len(orders), 3) if orders else None,
+            "load_ms": round((loaded - started) * 1000, 1),
+            "solve_ms": round((solved - loaded) * 1000, 1),
+            "commit_ms": round((time.perf_counter() - solved) * 1000, 1),
+        }
+        logger.info("Assignment tick: %s", self.last_tick)
+        return self.last_tick
+
+    async def _commit(self, repos: Repositories, pairs: List[Pair]) -> int:
+        if not pairs:
+            return 0
+        updated = await repos.orders.transition_many(
+            [
+                (
+                    order["_id"],
+                    {"status": "accepted", "fetcher_id": offer["fetcher_id"], "assigned_offer_id": offer["_id"]},
+                    {"status": "open", "fetcher_id": None},
+                )
+                for order, offer in pairs
+            ],
+            ORDER_SUMMARY,
+        )
+        assigned = list(updated.values())
+        await update_participants_many(assigned)
+
+        for order in assigned:
+            # The guard above only matched open orders; no actor, the scheduler made the change
+            await order_log.record(order["_id"], "order.accepted", None, "status", "open", order["status"])
+            publish_order_event("order.accepted", order_to_public(order))
+        return len(assigned)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"enabled": self._task is not None, "last_tick": self.last_tick, **self._counters}
+
+
+scheduler = AssignmentScheduler(settings.assign_interval_seconds)
@@ -0,0 +1,369 @@
+"""
+Cache abstraction shared by anything that memoizes Mongo reads.
+
+A `Cache` is a namespace over a backend: `MemoryBackend` (per-process LRU + TTL) or
+`MongoBackend` (a shared `cache_entries` collection with a TTL index). Invalidations
+are broadcast to every worker through `InvalidationBus`, a capped collection read with
+a tailable cursor, so per-process copies don't go stale when another worker writes.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson.timestamp import Timestamp
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, CursorType
+from pymongo.errors import CollectionInvalid
+
+from .config import settings
+from .database import database
+from .jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class MemoryBackend:
+    """Per-process LRU with per-entry expiry."""
+
+    shared = False
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MongoBackend:
+    """Entries shared by all workers. Values must be BSON-encodable."""
+
+    shared = True
+
+    def __init__(self, db: AsyncIOMotorDatabase, collection: str = "cache_entries") -> None:
+        self.collection = db[collection]
+        self.evictions = 0
+
+    async def get(self, key: str) -> Any:
+        # The TTL monitor only runs every 60s, so expiry is also checked on read
+        doc = await self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, {"value": 1}
+        )
+        return MISSING if doc is None else doc["value"]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"value": value, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)}},
+            upsert=True,
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.collection.delete_one({"_id": key})
+
+    async def delete_many(self, keys: List[str]) -> None:
+        await self.collection.delete_many({"_id": {"$in": keys}})
+
+    def __len__(self) -> int:
+        return 0
+
+
+class Cache:
+    """
+    One namespace of cached values. `get_or_load` coalesces concurrent misses for the
+    same key into a single loader call (single flight) so a hot key expiring doesn't
+    send a stampede of identical queries to Mongo.
+
+    A value read before an invalidation must not be stored after it, or the stale copy
+    comes back for a whole TTL. Every invalidation (local or from the bus) ticks a
+    clock and stamps the key with it; `set(..., since=snapshot())` stores nothing when
+    the key was invalidated after the snapshot. Stamps are kept for the most recent
+    MAX_STAMPS keys; older ones fold into a floor that counts as invalidated for every
+    key, which errs towards not caching.
+    """
+
+    MAX_STAMPS = 10000
+
+    def __init__(self, namespace: str, backend, ttl: float, bus: "InvalidationBus") -> None:
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.bus = bus
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._clock = 0
+        self._stamps: "OrderedDict[str, int]" = OrderedDict()
+        self._stamp_floor = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "coalesced": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+            "stale_sets_skipped": 0,
+        }
+
+    def _key(self, key: Any) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: Any) -> Any:
+        value = await self.backend.get(self._key(key))
+        self._counters["hits" if value is not MISSING else "misses"] += 1
+        return value
+
+    def snapshot(self) -> int:
+        """Take before reading a value from its source; pass to `set(since=)`."""
+        return self._clock
+
+    def _invalidated_since(self, full_key: str, since: int) -> bool:
+        return self._stamps.get(full_key, self._stamp_floor) > since
+
+    def _stamp(self, full_key: str) -> None:
+        self._clock += 1
+        self._stamps[full_key] = self._clock
+        self._stamps.move_to_end(full_key)
+        while len(self._stamps) > self.MAX_STAMPS:
+            _, stamp = self._stamps.popitem(last=False)
+            self._stamp_floor = max(self._stamp_floor, stamp)
+
+    async def set(self, key: Any, value: Any, ttl: Optional[float] = None, since: Optional[int] = None) -> bool:
+        """Store `value`; with `since`, only if `key` hasn't been invalidated after that snapshot."""
+        full_key = self._key(key)
+        if since is not None and self._invalidated_since(full_key, since):
+            self._counters["stale_sets_skipped"] += 1
+            return False
+        await self.backend.set(full_key, value, ttl or self.ttl)
+        return True
+
+    async def get_or_load(
+        self, key: Any, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None
+    ) -> Any:
+        """Return the cached value or call `loader()` once; None results are not cached."""
+        full_key = self._key(key)
+        value = await self.get(key)
+        if value is not MISSING:
+            return value
+
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        since = self.snapshot()
+        try:
+            self._counters["loads"] += 1
+            value = await loader()
+            if value is not None:
+                await self.set(key, value, ttl, since=since)
+            future.set_result(value)
+            return value
+        except Exception as exc:
+            self._counters["load_errors"] += 1
+            future.set_exception(exc)
+            # Waiters get the exception; mark it retrieved so an unawaited future doesn't warn
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(full_key, None)
+
+    async def invalidate(self, key: Any) -> None:
+        """Drop `key` here and in every other worker's copy."""
+        await self.invalidate_many([key])
+
+    async def invalidate_many(self, keys: List[Any], broadcast: bool = True) -> None:
+        """
+        `invalidate` for a batch of keys, sent as a few bus messages instead of one per key.
+        With `broadcast=False` only this worker (and the shared backend) forget them; the
+        caller sends the bus messages itself, e.g. from a broadcast_invalidations job.
+        """
+        full_keys = [self._key(key) for key in keys]
+        for full_key in full_keys:
+            self._stamp(full_key)
+        await self.backend.delete_many(full_keys)
+        self._counters["invalidations_sent"] += len(keys)
+        if broadcast:
+            await self.bus.publish(self.namespace, [str(key) for key in keys])
+
+    async def _drop_local(self, key: str) -> None:
+        self._counters["invalidations_received"] += 1
+        self._stamp(self._key(key))
+        await self.backend.delete(self._key(key))
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "backend": "mongo" if self.backend.shared else "memory",
+            "size": len(self.backend),
+            "evictions": self.backend.evictions,
+            "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+            **self._counters,
+        }
+
+
+class InvalidationBus:
+    """
+    Broadcasts (namespace, key) invalidations between workers through a capped
+    collection. Each worker tails it with a TAILABLE_AWAIT cursor, which works on a
+    standalone local mongod (change streams would need a replica set).
+
+    Messages are inserted with an empty BSON timestamp in `seq`, which the server
+    replaces with an increasing value of its own; a listener that reconnects resumes
+    after the last `seq` it saw. Client-generated _ids would not do: ObjectIds from
+    different processes and hosts don't sort in insertion order.
+    """
+
+    def __init__(self, collection: str, size_bytes: int) -> None:
+        self.collection_name = collection
+        self.size_bytes = size_bytes
+        self.origin = uuid.uuid4().hex
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._caches: Dict[str, Cache] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether invalidations published in other workers reach this one."""
+        return self._task is not None
+
+    def register(self, cache: Cache) -> None:
+        self._caches[cache.namespace] = cache
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        try:
+            await db.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass
+        # A tailable cursor on an empty capped collection dies at once; seed it
+        marker = await db[self.collection_name].insert_one(
+            {"seq": Timestamp(0, 0), "origin": self.origin, "namespace": None, "at": datetime.utcnow()}
+        )
+        marker = await db[self.collection_name].find_one({"_id": marker.inserted_id}, {"seq": 1})
+        self._task = asyncio.create_task(self._listen(marker["seq"]))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def publish(self, namespace: str, keys: List[str], origin: Optional[str] = None) -> None:
+        """`origin` is the worker that already dropped the keys (this one by default)."""
+        if self._db is None or not keys:
+            return
+        # Chunked so one message stays small relative to the capped collection
+        now = datetime.utcnow()
+        await self._db[self.collection_name].insert_many(
+            [
+                {
+                    "seq": Timestamp(0, 0),
+                    "origin": origin or self.origin,
+                    "namespace": namespace,
+                    "keys": keys[i : i + 500],
+                    "at": now,
+                }
+                for i in range(0, len(keys), 500)
+            ]
+        )
+
+    async def _listen(self, last_seq: Timestamp) -> None:
+        collection = self._db[self.collection_name]
+        while True:
+            try:
+                cursor = collection.find(
+                    {"seq": {"$gt": last_seq}}, cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for doc in cursor:
+                        last_seq = doc["seq"]
+                        cache = self._caches.get(doc.get("namespace"))
+                        if cache is not None and doc.get("origin") != self.origin:
+                            for key in doc.get("keys", ()):
+                                await cache._drop_local(key)
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener failed, restarting")
+            await asyncio.sleep(1)
+
+
+bus = InvalidationBus(settings.cache_bus_collection, settings.cache_bus_size_bytes)
+_caches: Dict[str, Cache] = {}
+
+
+@job_queue.handler("broadcast_invalidations")
+async def broadcast_invalidations(
+    db: AsyncIOMotorDatabase, namespace: str, keys: List[str], origin: str
+) -> None:
+    """Send the bus messages for keys a request already invalidated in its own worker."""
+    await bus.publish(namespace, keys, origin=origin)
+
+
+def get_cache(
+    namespace: str, ttl: float, max_entries: int = 10000, shared: Optional[bool] = None
+) -> Cache:
+    """
+    Return the cache for `namespace`, creating it on first use. `shared=True` stores
+    entries in Mongo (see `MongoBackend`) instead of this process's memory; the
+    default comes from CACHE_BACKEND.
+    """
+    cache = _caches.get(namespace)
+    if cache is None:
+        if shared is None:
+            shared = settings.cache_backend == "mongo"
+        if shared:
+            backend = MongoBackend(database.db)
+        else:
+            backend = MemoryBackend(max_entries)
+        cache = _caches[namespace] = Cache(namespace, backend, ttl, bus)
+        bus.register(cache)
+    return cache
+
+
+async def start_caches(db: AsyncIOMotorDatabase) -> None:
+    await db.cache_entries.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    if settings.cache_bus_enabled:
+        await bus.start(db)
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    return {namespace: cache.metrics() for namespace, cache in _caches.items()}
@@ -0,0 +1,243 @@
+"""
+Response compression.
+
+`CompressionMiddleware` negotiates Accept-Encoding (br when the `brotli` package is
+installed, otherwise gzip) and compresses JSON and text responses of at least
+COMPRESSION_MIN_BYTES. Streamed responses are compressed chunk by chunk, each chunk
+flushed so the client gets it as soon as the app sends it. SSE (`text/event-stream`)
+is left alone: its messages are tiny and the stream must not wait on a compressor.
+
+GET routes in COMPRESSION_CACHE_ROUTES ("METHOD /prefix=seconds", like ROUTE_TIMEOUTS_MS)
+keep returning the same bytes to many requests: the public offers feed, a chat page
+nobody has posted to since the last poll. Those responses get a weak ETag hashed from
+the body, so a matching If-None-Match is answered with a bodiless 304. Their
+compressed bytes are cached under the ETag for that many seconds, so a hot body is
+compressed once per worker instead of on every request. Hashing costs a small fraction
+of compressing.
+"""
+
+import hashlib
+import zlib
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .cache import MISSING, get_cache
+from .config import settings
+from .utils import match_route, parse_route_map
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+CACHE_ROUTES = parse_route_map(settings.compression_cache_routes)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+compressed_cache = get_cache(
+    "compressed_responses", ttl=300, max_entries=settings.compression_cache_size, shared=False
+)
+
+_counters = {
+    "compressed": 0,
+    "streamed": 0,
+    "cache_hits": 0,
+    "not_modified": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+
+
+class _Gzip:
+    def __init__(self) -> None:
+        self._zlib = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._brotli = brotli.Compressor(quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._brotli.process(data) + self._brotli.finish()
+
+
+ENCODERS = {"gzip": _Gzip}
+if brotli is not None:
+    ENCODERS["br"] = _Brotli
+# Preferred first when the client accepts both equally
+PREFERENCE = ("br", "gzip")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The encoding to use for an Accept-Encoding value, or None for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        param, _, value = params.strip().partition("=")
+        if param.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    candidates = [
+        (weights.get(name, weights.get("*", 0.0)), -rank, name)
+        for rank, name in enumerate(PREFERENCE)
+        if name in ENCODERS
+    ]
+    weight, _, name = max(candidates)
+    return name if weight > 0 else None
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return (
+        "content-encoding" not in headers
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith(UNCOMPRESSIBLE_TYPES)
+    )
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" are the same validator
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+class CompressionMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        cache_ttl = match_route(CACHE_ROUTES, scope["method"], scope["path"]) if scope["method"] == "GET" else None
+        if encoding is None and cache_ttl is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _Responder(send, encoding, cache_ttl, request_headers.get("if-none-match"))
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """Holds back http.response.start until the first body chunk shows what to do with it."""
+
+    def __init__(self, send, encoding: Optional[str], cache_ttl: Optional[str], if_none_match: Optional[str]) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.cache_ttl = cache_ttl
+        self.if_none_match = if_none_match
+        self._start: Optional[Dict[str, Any]] = None
+        self._encoder = None
+        self._passthrough = False
+
+    async def send(self, message) -> None:
+        if self._passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self._start = {**message, "headers": list(message.get("headers", []))}
+        elif message["type"] != "http.response.body":
+            await self._send(message)
+        elif self._encoder is not None:
+            await self._stream(message)
+        elif message.get("more_body", False):
+            await self._begin_stream(message)
+        else:
+            await self._complete(message.get("body", b""))
+
+    async def _complete(self, body: bytes) -> None:
+        start = self._start
+        headers = MutableHeaders(scope=start)
+        compressible = len(body) >= settings.compression_min_bytes and is_compressible(headers)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        etag = body_etag(body) if self.cache_ttl is not None and start["status"] == 200 else None
+
+        if etag is not None:
+            headers["etag"] = etag
+            headers.setdefault("cache-control", "private, no-cache")
+            if self.if_none_match and etag_matches(self.if_none_match, etag):
+                _counters["not_modified"] += 1
+                for name in ("content-length", "content-type"):
+                    del headers[name]
+                await self._send({**start, "status": 304})
+                await self._send({"type": "http.response.body", "body": b""})
+                return
+
+        if compressible and self.encoding is not None:
+            body = await self._compressed(body, etag)
+            headers["content-encoding"] = self.encoding
+            headers["content-length"] = str(len(body))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": body})
+
+    async def _compressed(self, body: bytes, etag: Optional[str]) -> bytes:
+        key = f"{self.encoding}:{etag}"
+        if etag is not None:
+            cached = await compressed_cache.get(key)
+            if cached is not MISSING:
+                _counters["cache_hits"] += 1
+                return cached
+        compressed = ENCODERS[self.encoding]().finish(body)
+        _counters["compressed"] += 1
+        _counters["bytes_in"] += len(body)
+        _counters["bytes_out"] += len(compressed)
+        if etag is not None:
+            await compressed_cache.set(key, compressed, ttl=float(self.cache_ttl))
+        return compressed
+
+    async def _begin_stream(self, message) -> None:
+        headers = MutableHeaders(scope=self._start)
+        length = headers.get("content-length")
+        small = length is not None and int(length) < settings.compression_min_bytes
+        if self.encoding is None or small or not is_compressible(headers):
+            self._passthrough = True
+            await self._send(self._start)
+            await self._send(message)
+            return
+        del headers["content-length"]
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        self._encoder = ENCODERS[self.encoding]()
+        _counters["streamed"] += 1
+        await self._send(self._start)
+        await self._stream(message)
+
+    async def _stream(self, message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        chunk = self._encoder.compress(body) if more_body else self._encoder.finish(body)
+        _counters["bytes_in"] += len(body)
+        _counters["bytes_out"] += len(chunk)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+def compression_metrics() -> Dict[str, Any]:
+    bytes_in, bytes_out = _counters["bytes_in"], _counters["bytes_out"]
+    return {
+        "encodings": [name for name in PREFERENCE if name in ENCODERS],
+        "min_bytes": settings.compression_min_bytes,
+        "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        **_counters,
+    }
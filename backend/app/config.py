@@ -7,6 +7,8 @@ class Settings:
     def __init__(self) -> None:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
         self.mongo_db_name = os.getenv("MONGO_DB_NAME", "yaarfetch")
+        # "mongo", or "memory" to serve the API from in-process dicts (tests, benchmarks)
+        self.storage_engine = os.getenv("STORAGE_ENGINE", "mongo")
         self.jwt_secret = os.getenv("JWT_SECRET", "change-me")
         self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
         self.access_token_expire_minutes = int(
@@ -19,6 +21,116 @@ class Settings:
             if raw_origins.strip() == "*"
             else [origin.strip() for origin in raw_origins.split(",") if origin.strip()]
         )
+        # Comma separated emails allowed to use the /admin endpoints
+        self.admin_emails = {
+            email.strip().lower()
+            for email in os.getenv("ADMIN_EMAILS", "").split(",")
+            if email.strip()
+        }
+
+        # Background job queue for post-commit side effects
+        self.job_workers = int(os.getenv("JOB_WORKERS", "4"))
+        self.job_queue_size = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+        self.job_max_retries = int(os.getenv("JOB_MAX_RETRIES", "3"))
+        self.job_retry_backoff_seconds = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.job_drain_timeout_seconds = float(os.getenv("JOB_DRAIN_TIMEOUT_SECONDS", "10"))
+        self.job_queue_durable = os.getenv("JOB_QUEUE_DURABLE", "false").lower() == "true"
+
+        # Server-sent events stream (/events)
+        self.sse_heartbeat_seconds = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+        self.sse_replay_size = int(os.getenv("SSE_REPLAY_SIZE", "50"))
+        self.sse_queue_size = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+        self.sse_max_connections_per_user = int(os.getenv("SSE_MAX_CONNECTIONS_PER_USER", "5"))
+        self.sse_max_tracked_users = int(os.getenv("SSE_MAX_TRACKED_USERS", "10000"))
+
+        # Server-Timing header and N+1 warnings
+        self.server_timing_enabled = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+        self.n1_max_commands = int(os.getenv("N1_MAX_COMMANDS", "10"))
+        self.n1_max_repeats = int(os.getenv("N1_MAX_REPEATS", "3"))
+
+        # Admin profiling sessions (/admin/profile) are capped to keep overhead bounded
+        self.profile_max_seconds = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+        self.profile_max_requests = int(os.getenv("PROFILE_MAX_REQUESTS", "200"))
+        self.profile_min_interval_ms = float(os.getenv("PROFILE_MIN_INTERVAL_MS", "1"))
+        self.profile_max_stack_depth = int(os.getenv("PROFILE_MAX_STACK_DEPTH", "64"))
+        self.profile_max_stacks = int(os.getenv("PROFILE_MAX_STACKS", "10000"))
+
+        # Caches: "memory" (per worker) or "mongo" (shared cache_entries collection)
+        self.cache_backend = os.getenv("CACHE_BACKEND", "memory")
+        self.cache_bus_enabled = os.getenv("CACHE_BUS_ENABLED", "true").lower() == "true"
+        self.cache_bus_collection = os.getenv("CACHE_BUS_COLLECTION", "cache_invalidations")
+        self.cache_bus_size_bytes = int(os.getenv("CACHE_BUS_SIZE_BYTES", str(1024 * 1024)))
+        # orjson fast path for list responses (see serialization.py)
+        self.fast_json_enabled = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
+        # Verified JWT claims, kept until each token's exp
+        self.token_cache_enabled = os.getenv("TOKEN_CACHE_ENABLED", "true").lower() == "true"
+        self.token_cache_size = int(os.getenv("TOKEN_CACHE_SIZE", "20000"))
+        # Without the invalidation bus a logout in another worker can't evict a cached
+        # token, so entries live at most this long there
+        self.token_cache_unsynced_ttl_seconds = float(os.getenv("TOKEN_CACHE_UNSYNCED_TTL_SECONDS", "30"))
+        # Order participant map used by chat authorization
+        self.participant_cache_ttl_seconds = float(os.getenv("PARTICIPANT_CACHE_TTL_SECONDS", "300"))
+        self.participant_cache_size = int(os.getenv("PARTICIPANT_CACHE_SIZE", "50000"))
+
+        # Archival of settled orders to orders_archive / chats_archive
+        self.archive_min_age_days = float(os.getenv("ARCHIVE_MIN_AGE_DAYS", "7"))
+        self.archive_batch_size = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+        self.archive_max_batches = int(os.getenv("ARCHIVE_MAX_BATCHES", "100"))
+        self.archive_chats = os.getenv("ARCHIVE_CHATS", "true").lower() == "true"
+
+        # Request deadlines (sent to Mongo as maxTimeMS) and load shedding, per worker
+        self.request_timeout_ms = float(os.getenv("REQUEST_TIMEOUT_MS", "5000"))
+        self.request_timeout_max_ms = float(os.getenv("REQUEST_TIMEOUT_MAX_MS", "30000"))
+        # "METHOD /prefix=ms" or "/prefix=ms", comma separated; the longest matching prefix wins
+        self.route_timeouts_ms = os.getenv(
+            "ROUTE_TIMEOUTS_MS", "GET /orders=3000,GET /offers=3000,GET /chat=3000,GET /dashboard=3000"
+        )
+        self.admission_max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "200"))
+        self.admission_max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "500"))
+        self.admission_max_queue_wait_ms = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "1000"))
+        self.admission_retry_after_seconds = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+        # Read routing: client-wide read preference plus per-route overrides ("METHOD /prefix=mode"),
+        # and read/write concern; unset concerns use the server's defaults
+        self.read_preference = os.getenv("READ_PREFERENCE", "primary")
+        self.route_read_preferences = os.getenv(
+            "ROUTE_READ_PREFERENCES",
+            "GET /offers=secondaryPreferred,GET /orders=secondaryPreferred,GET /dashboard=secondaryPreferred",
+        )
+        self.max_staleness_seconds = int(os.getenv("MAX_STALENESS_SECONDS", "-1"))
+        self.read_concern_level = os.getenv("READ_CONCERN_LEVEL") or None
+        self.write_concern_w = os.getenv("WRITE_CONCERN_W") or None
+        self.causal_sessions_enabled = os.getenv("CAUSAL_SESSIONS_ENABLED", "true").lower() == "true"
+
+        # Response compression (br when the brotli package is installed, else gzip) for bodies of at
+        # least MIN_BYTES. GET routes in CACHE_ROUTES ("METHOD /prefix=seconds") also get ETags and
+        # 304s, and keep their compressed bytes cached for that long
+        self.compression_enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.compression_min_bytes = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+        self.compression_gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.compression_brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+        self.compression_cache_routes = os.getenv("COMPRESSION_CACHE_ROUTES", "GET /offers=300,GET /chat=300")
+        self.compression_cache_size = int(os.getenv("COMPRESSION_CACHE_SIZE", "1000"))
+
+        # Most items accepted by POST /orders/bulk and PATCH /orders/bulk/status
+        self.order_bulk_max_items = int(os.getenv("ORDER_BULK_MAX_ITEMS", "50"))
+
+        # Order event log (order_events): buffered and written in batches of FLUSH_SIZE or
+        # every FLUSH_INTERVAL; at most MAX_UNFLUSHED events per worker can be lost, 0 writes through
+        self.order_log_enabled = os.getenv("ORDER_LOG_ENABLED", "true").lower() == "true"
+        self.order_log_flush_size = int(os.getenv("ORDER_LOG_FLUSH_SIZE", "100"))
+        self.order_log_flush_interval_seconds = float(os.getenv("ORDER_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+        self.order_log_max_unflushed = int(os.getenv("ORDER_LOG_MAX_UNFLUSHED", "1000"))
+
+        # Batch auto-assignment of open orders to fetchers (off by default)
+        self.assign_enabled = os.getenv("ASSIGN_ENABLED", "false").lower() == "true"
+        self.assign_interval_seconds = float(os.getenv("ASSIGN_INTERVAL_SECONDS", "30"))
+        self.assign_max_orders = int(os.getenv("ASSIGN_MAX_ORDERS", "20000"))
+        self.assign_max_offers = int(os.getenv("ASSIGN_MAX_OFFERS", "20000"))
+        # Offers are for one trip ("arriving 5:00 PM"); older ones aren't matched any more
+        self.assign_offer_max_age_hours = float(os.getenv("ASSIGN_OFFER_MAX_AGE_HOURS", "12"))
+        # orders x fetchers up to which the optimal (Hungarian) solver is used instead of greedy
+        self.assign_optimal_max_pairs = int(os.getenv("ASSIGN_OPTIMAL_MAX_PAIRS", "2500"))
 
 
 settings = Settings()
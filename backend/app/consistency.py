@@ -0,0 +1,159 @@
+"""
+Read routing and causally consistent sessions for replica set deployments.
+
+`routed_db` gives a route the database handle for its read preference, so listings
+that tolerate slight staleness (ROUTE_READ_PREFERENCES) can be served by secondaries.
+
+`CausalSessionMiddleware` runs each request inside a causally consistent session bound
+with `ClientSession.bind()`, so every operation in the request uses it without passing
+`session=` around. Requests carry the session's cluster and operation time across in
+the X-Causal-Token header: the response returns it, and the client sends back the
+latest one it has seen. A secondary then waits until it has caught up to that point
+before answering, which means a user always reads their own writes (say, right after
+`accept_order`) even when the read is served by a different node or worker.
+
+A ClientSession must only be used by one thread at a time, and Motor runs concurrent
+operations on different executor threads. Handlers that run reads concurrently use
+`gather`, which gives each branch its own session started from the request's causal
+point and folds the branches' times back into the request session afterwards.
+"""
+
+import asyncio
+import base64
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+import bson
+from bson.timestamp import Timestamp
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+from .config import settings
+from .database import database
+from .utils import match_route, parse_route_map
+
+CAUSAL_HEADER = b"x-causal-token"
+
+# Long-lived streams would hold a session open for their whole lifetime
+EXEMPT_PREFIXES = ("/events",)
+
+ROUTE_READ_PREFERENCES = parse_route_map(settings.route_read_preferences)
+
+# The session CausalSessionMiddleware bound for the current request, if any
+request_session: ContextVar[Optional[Any]] = ContextVar("request_session", default=None)
+
+_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def make_read_preference(mode: str):
+    if mode == "primary":
+        return Primary()
+    if mode not in _MODES:
+        raise ValueError(f"Unknown read preference {mode!r}")
+    return _MODES[mode](max_staleness=settings.max_staleness_seconds)
+
+
+_routed: Dict[Tuple[int, str], AsyncIOMotorDatabase] = {}
+
+
+def routed_db(db: AsyncIOMotorDatabase, method: str, path: str) -> AsyncIOMotorDatabase:
+    """`db` with the read preference configured for this route, if it differs from the default."""
+    mode = match_route(ROUTE_READ_PREFERENCES, method, path) or settings.read_preference
+    if mode == settings.read_preference:
+        return db
+    key = (id(db), mode)
+    if key not in _routed:
+        _routed[key] = db.with_options(read_preference=make_read_preference(mode))
+    return _routed[key]
+
+
+def encode_token(session) -> Optional[bytes]:
+    if session.operation_time is None or session.cluster_time is None:
+        return None
+    doc = {"operationTime": session.operation_time, "clusterTime": session.cluster_time}
+    return base64.urlsafe_b64encode(bson.encode(doc))
+
+
+def apply_token(session, token: bytes) -> None:
+    try:
+        doc = bson.decode(base64.urlsafe_b64decode(token))
+    except Exception:
+        return
+    # A malformed or forged token only costs this request its causal guarantee; a
+    # far-future one is bounded by the request deadline (maxTimeMS)
+    cluster_time: Any = doc.get("clusterTime")
+    if isinstance(cluster_time, dict) and isinstance(cluster_time.get("clusterTime"), Timestamp):
+        session.advance_cluster_time(cluster_time)
+    if isinstance(doc.get("operationTime"), Timestamp):
+        session.advance_operation_time(doc["operationTime"])
+
+
+def _advance(session, source) -> None:
+    if source.cluster_time is not None:
+        session.advance_cluster_time(source.cluster_time)
+    if source.operation_time is not None:
+        session.advance_operation_time(source.operation_time)
+
+
+async def gather(*aws: Awaitable[Any]) -> List[Any]:
+    """`asyncio.gather` for a request's concurrent reads, one causal session per branch."""
+    parent = request_session.get()
+    if parent is None:
+        return await asyncio.gather(*aws)
+
+    async def branch(aw: Awaitable[Any]) -> Any:
+        session = database.client.delegate.start_session(causal_consistency=True)
+        _advance(session, parent)
+        try:
+            # Binding inside the branch's own task only affects that task's context
+            with session.bind(end_session=False):
+                return await aw
+        finally:
+            _advance(parent, session)
+            session.end_session()
+
+    return await asyncio.gather(*(branch(aw) for aw in aws))
+
+
+class CausalSessionMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Motor's client wraps a PyMongo one; binding its session reaches Motor's executor
+        # threads because Motor copies the request's context into them
+        session = database.client.delegate.start_session(causal_consistency=True)
+        for name, value in scope.get("headers", []):
+            if name == CAUSAL_HEADER:
+                apply_token(session, value)
+                break
+
+        async def send_with_token(message) -> None:
+            if message["type"] == "http.response.start":
+                token = encode_token(session)
+                if token:
+                    message = {**message, "headers": [*message.get("headers", []), (CAUSAL_HEADER, token)]}
+            await send(message)
+
+        context_token = request_session.set(session)
+        try:
+            with session.bind(end_session=False):
+                await self.app(scope, receive, send_with_token)
+        finally:
+            request_session.reset(context_token)
+            session.end_session()
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from .config import settings
+from .instrumentation import command_timer
 
 
 class Database:
@@ -11,7 +12,15 @@ class Database:
 
     def __init__(self) -> None:
         try:
-            self.client = AsyncIOMotorClient(settings.mongo_uri)
+            options = {"readPreference": settings.read_preference}
+            if settings.read_concern_level:
+                options["readConcernLevel"] = settings.read_concern_level
+            if settings.write_concern_w:
+                w = settings.write_concern_w
+                options["w"] = int(w) if w.isdigit() else w
+            self.client = AsyncIOMotorClient(
+                settings.mongo_uri, event_listeners=[command_timer], **options
+            )
             self.db = self.client[settings.mongo_db_name]
         except Exception as exc:  # pragma: no cover - defensive
             raise RuntimeError("Failed to initialize Mongo client") from exc
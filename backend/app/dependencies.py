@@ -1,42 +1,101 @@
-from fastapi import Depends, HTTPException, status
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
 
+from .config import settings
+from .consistency import routed_db
 from .database import database
-from .security import decode_token
+from .instrumentation import timed
+from .projections import USER_PUBLIC
+from .repositories import MemoryStore, MotorStore, Repositories
+from .security import verify_token
 from .utils import object_id_to_str, to_object_id, user_to_public
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-async def get_db() -> AsyncIOMotorDatabase:
+async def get_db(request: Request) -> AsyncIOMotorDatabase:
     async for db in database.get_db():
-        return db
+        # Routes listed in ROUTE_READ_PREFERENCES may read from secondaries
+        return routed_db(db, request.method, request.url.path)
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database unavailable"
     )
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncIOMotorDatabase = Depends(get_db)
-):
+_memory_repos = Repositories(MemoryStore())
+_motor_repos: Dict[int, Repositories] = {}
+
+
+def repos_for(db: AsyncIOMotorDatabase) -> Repositories:
+    """Repositories on the configured STORAGE_ENGINE, over `db` when that's Mongo."""
+    if settings.storage_engine == "memory":
+        return _memory_repos
+    # One set per routed handle; those live as long as the process (see consistency.routed_db)
+    if id(db) not in _motor_repos:
+        _motor_repos[id(db)] = Repositories(MotorStore(db))
+    return _motor_repos[id(db)]
+
+
+async def get_repos(request: Request) -> Repositories:
+    """
+    Repositories for this request's route. Tests can swap engines per app by overriding
+    this dependency with one that returns their own `Repositories(MemoryStore())`.
+    """
+    if settings.storage_engine == "memory":
+        return _memory_repos
+    return repos_for(await get_db(request))
+
+
+async def _user_from_token(token: Optional[str], repos: Repositories):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
-        payload = decode_token(token)
+        payload = await verify_token(token, repos.users.is_token_revoked)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except HTTPException:
+    except (HTTPException, PyMongoError):
+        # Database errors (e.g. the deadline running out) keep their own status code
         raise
     except Exception as exc:
         raise credentials_exception from exc
 
-    user = await db.users.find_one({"_id": to_object_id(user_id)})
+    user = await repos.users.get(to_object_id(user_id), USER_PUBLIC)
     if not user:
         raise credentials_exception
     return user_to_public(user)
 
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), repos: Repositories = Depends(get_repos)
+):
+    with timed("auth"):
+        return await _user_from_token(token, repos)
+
+
+async def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None),
+    repos: Repositories = Depends(get_repos),
+):
+    # Browsers can't set headers on EventSource, so streams also accept ?access_token=
+    with timed("auth"):
+        return await _user_from_token(token or access_token, repos)
+
+
+async def get_admin_user(current_user=Depends(get_current_user)):
+    if (current_user.get("email") or "").lower() not in settings.admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
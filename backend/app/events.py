@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from .config import settings
+
+
+class Subscription:
+    """One open SSE connection. Its queue is bounded so a slow client can't grow memory."""
+
+    def __init__(self, user_id: str, queue_size: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def close(self) -> None:
+        # A None sentinel tells the stream to end; the client reconnects with
+        # Last-Event-ID and catches up from the replay buffer.
+        self.closed = True
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+
+
+class EventBroker:
+    """
+    In-process fan-out of per-user events to SSE connections.
+
+    Every user keeps a short replay buffer so a reconnecting client can resume from
+    `Last-Event-ID`. Event ids carry a per-process boot token; an id from another
+    boot (a restart) replays the whole buffer instead.
+    """
+
+    def __init__(
+        self,
+        replay_size: int,
+        queue_size: int,
+        max_connections_per_user: int,
+        max_tracked_users: int,
+    ) -> None:
+        self.replay_size = replay_size
+        self.queue_size = queue_size
+        self.max_connections_per_user = max_connections_per_user
+        self.max_tracked_users = max_tracked_users
+
+        self._boot = format(int(time.time()), "x")
+        self._seq = itertools.count(1)
+        self._replay: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._counters = {"published": 0, "delivered": 0, "overflowed": 0}
+
+    def publish(self, user_ids: Iterable[Optional[str]], event: str, data: Dict[str, Any]) -> None:
+        for user_id in {uid for uid in user_ids if uid}:
+            message = {"id": f"{self._boot}-{next(self._seq)}", "event": event, "data": data}
+
+            buffer = self._replay.get(user_id)
+            if buffer is None:
+                buffer = self._replay[user_id] = deque(maxlen=self.replay_size)
+            self._replay.move_to_end(user_id)
+            buffer.append(message)
+            while len(self._replay) > self.max_tracked_users:
+                self._replay.popitem(last=False)
+
+            self._counters["published"] += 1
+            for sub in self._subscribers.get(user_id, []):
+                if sub.closed:
+                    continue
+                try:
+                    sub.queue.put_nowait(message)
+                    self._counters["delivered"] += 1
+                except asyncio.QueueFull:
+                    self._counters["overflowed"] += 1
+                    sub.close()
+
+    def _missed(self, user_id: str, last_event_id: Optional[str]) -> List[Dict[str, Any]]:
+        buffer = self._replay.get(user_id)
+        if not buffer or not last_event_id:
+            return []
+        boot, _, seq = last_event_id.partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return list(buffer)
+        last_seq = int(seq)
+        return [m for m in buffer if int(m["id"].partition("-")[2]) > last_seq]
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        for message in self._missed(user_id, last_event_id)[-self.queue_size:]:
+            sub.queue.put_nowait(message)
+
+        subs = self._subscribers.setdefault(user_id, [])
+        subs.append(sub)
+        # Oldest connections (usually abandoned tabs) make room for new ones
+        while len(subs) > self.max_connections_per_user:
+            subs.pop(0).close()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if not subs:
+            return
+        if sub in subs:
+            subs.remove(sub)
+        if not subs:
+            del self._subscribers[sub.user_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "connections": sum(len(subs) for subs in self._subscribers.values()),
+            "connected_users": len(self._subscribers),
+            "tracked_users": len(self._replay),
+            **self._counters,
+        }
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    payload = json.dumps(message["data"], default=str, separators=(",", ":"))
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {payload}\n\n"
+
+
+broker = EventBroker(
+    replay_size=settings.sse_replay_size,
+    queue_size=settings.sse_queue_size,
+    max_connections_per_user=settings.sse_max_connections_per_user,
+    max_tracked_users=settings.sse_max_tracked_users,
+)
+
+
+def publish_order_event(event: str, order: Dict[str, Any]) -> None:
+    """Push a lifecycle event for a (public) order to both participants' /events streams."""
+    broker.publish(
+        [order["requester_id"], order["fetcher_id"]],
+        event,
+        {
+            "order_id": order["id"],
+            "status": order["status"],
+            "payment_sent": order.get("payment_sent", False),
+            "payout_status": order.get("payout_status"),
+        },
+    )
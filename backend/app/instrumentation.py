@@ -0,0 +1,229 @@
+import functools
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Per-request counters. Mongo events arrive on Motor's executor threads, hence the lock."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.route: Optional[str] = None
+        self.commands = 0
+        self.mongo_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_command(self, shape: str, duration_ms: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.mongo_ms += duration_ms
+            self.shapes[shape] += 1
+
+    def add_timing(self, name: str, duration_ms: float) -> None:
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + duration_ms
+
+
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request under `name`."""
+    stats = current_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.add_timing(name, (time.perf_counter() - start) * 1000)
+
+
+def _filter_shape(value: Any) -> Any:
+    # Keep keys and operators, drop literal values: {"_id": {"$in": [...]}} -> {_id:{$in}}
+    if isinstance(value, dict):
+        keys = (
+            f"{key}:{_filter_shape(item)}" if isinstance(item, (dict, list)) else key
+            for key, item in value.items()
+        )
+        return "{" + ",".join(keys) + "}"
+    if isinstance(value, list):
+        nested = {_filter_shape(item) for item in value if isinstance(item, (dict, list))}
+        return "[" + ",".join(sorted(nested)) + "]"
+    return "?"
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> str:
+    collection = command.get(command_name)
+    query = command.get("filter") or command.get("query")
+    if query is None and command.get("updates"):
+        query = command["updates"][0].get("q")
+    if query is None and command.get("deletes"):
+        query = command["deletes"][0].get("q")
+    return f"{command_name} {collection} {_filter_shape(query) if query is not None else ''}".strip()
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Attributes every Mongo command to the request that issued it."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[Tuple[Any, int], Tuple[RequestStats, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        stats = current_stats.get()
+        if stats is None:
+            return
+        shape = command_shape(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (stats, shape)
+
+    def _finish(self, event) -> None:
+        with self._lock:
+            entry = self._pending.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            stats, shape = entry
+            stats.add_command(shape, event.duration_micros / 1000)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+
+command_timer = CommandTimer()
+
+
+def route_template(request, path_format: str) -> str:
+    """
+    Full path template such as /orders/{order_id}/accept. Included routers may only
+    know their own part of the path, so the prefix is recovered from the real URL.
+    """
+    rendered = path_format
+    for name, value in request.path_params.items():
+        rendered = rendered.replace("{" + name + "}", str(value))
+    path = request.url.path
+    prefix = path[: len(path) - len(rendered)] if path.endswith(rendered) else ""
+    return prefix + path_format
+
+
+class TimedRoute(APIRoute):
+    """
+    Splits a request into `handler` (the endpoint body) and `serialize` (what FastAPI
+    does around it besides dependencies: body parsing, response validation, encoding).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args: Any, **kw: Any) -> Any:
+            with timed("handler"):
+                return await endpoint(*args, **kw)
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            stats = current_stats.get()
+            if stats is not None:
+                stats.route = f"{request.method} {route_template(request, self.path_format)}"
+            with timed("route"):
+                return await handler(request)
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that reports per-request Mongo, auth, handler and serialization
+    time as a Server-Timing header and a structured log line, and warns about requests
+    that look like N+1 query patterns.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", self._header(stats).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            self._log(scope, stats, status_code)
+
+    @staticmethod
+    def _phases(stats: RequestStats) -> Dict[str, float]:
+        auth = stats.timings.get("auth", 0.0)
+        handler = stats.timings.get("handler", 0.0)
+        route = stats.timings.get("route", 0.0)
+        return {
+            "mongo": stats.mongo_ms,
+            "auth": auth,
+            "handler": handler,
+            "serialize": max(route - auth - handler, 0.0),
+            "total": (time.perf_counter() - stats.started) * 1000,
+        }
+
+    def _header(self, stats: RequestStats) -> str:
+        parts = []
+        for name, duration in self._phases(stats).items():
+            part = f"{name};dur={duration:.1f}"
+            if name == "mongo":
+                part += f';desc="{stats.commands} cmds"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def _log(self, scope, stats: RequestStats, status_code: int) -> None:
+        record = {
+            "route": stats.route or f"{scope.get('method')} {scope.get('path')}",
+            "status": status_code,
+            "mongo_commands": stats.commands,
+            **{f"{name}_ms": round(value, 2) for name, value in self._phases(stats).items()},
+        }
+        logger.info(json.dumps(record))
+
+        repeated = {shape: n for shape, n in stats.shapes.items() if n >= settings.n1_max_repeats}
+        if stats.commands > settings.n1_max_commands or repeated:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "possible_n_plus_one",
+                        "route": record["route"],
+                        "mongo_commands": stats.commands,
+                        "repeated_shapes": repeated,
+                    }
+                )
+            )
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[None]]
+
+
+class JobQueue:
+    """
+    Bounded worker pool for side effects that should not hold up a response.
+
+    In memory mode jobs live in an asyncio.Queue and are lost on restart. In durable
+    mode every job is a document in the `jobs` collection that workers claim with a
+    lease, so pending work survives restarts and is shared between uvicorn workers.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        maxsize: int,
+        max_retries: int,
+        backoff_seconds: float,
+        durable: bool = False,
+    ) -> None:
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.durable = durable
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._delayed: Set[asyncio.Task] = set()
+        self._accepting = False
+        self._in_flight = 0
+        self._counters = {
+            "enqueued": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+        self._max_wait = 0.0
+
+    def handler(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        """Register `func(db, **payload)` as the handler for jobs called `name`."""
+
+        def decorator(func: JobHandler) -> JobHandler:
+            self._handlers[name] = func
+            return func
+
+        return decorator
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._wakeup = asyncio.Event()
+        if self.durable:
+            await db.jobs.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+        self._accepting = True
+        self._tasks = [
+            asyncio.create_task(self._durable_worker() if self.durable else self._worker())
+            for _ in range(self.workers)
+        ]
+
+    async def enqueue(self, name: str, **payload: Any) -> bool:
+        """
+        Queue a job without waiting for it. Returns False (and counts a rejection)
+        when the queue is full or shutting down, so callers can decide to run inline.
+        """
+        if name not in self._handlers:
+            raise KeyError(f"No job handler registered for {name!r}")
+        if not self._accepting:
+            self._counters["rejected"] += 1
+            return False
+
+        if self.durable:
+            await self._db.jobs.insert_one(
+                {
+                    "name": name,
+                    "payload": payload,
+                    "status": "pending",
+                    "attempts": 0,
+                    "run_at": datetime.utcnow(),
+                    "created_at": datetime.utcnow(),
+                }
+            )
+            self._counters["enqueued"] += 1
+            self._wakeup.set()
+            return True
+
+        job = {"name": name, "payload": payload, "attempts": 0, "queued_at": time.monotonic()}
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            logger.warning("Job queue full, rejected %s", name)
+            return False
+        self._counters["enqueued"] += 1
+        return True
+
+    def _backoff(self, attempts: int) -> float:
+        delay = self.backoff_seconds * (2 ** (attempts - 1))
+        return delay + random.uniform(0, delay / 2)
+
+    async def _run(self, name: str, payload: Dict[str, Any]) -> None:
+        self._in_flight += 1
+        try:
+            await self._handlers[name](self._db, **payload)
+        finally:
+            self._in_flight -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._max_wait = max(self._max_wait, time.monotonic() - job["queued_at"])
+            try:
+                await self._run(job["name"], job["payload"])
+                self._counters["completed"] += 1
+            except Exception:
+                job["attempts"] += 1
+                if job["attempts"] > self.max_retries:
+                    self._counters["failed"] += 1
+                    logger.exception("Job %s failed after %s attempts", job["name"], job["attempts"])
+                else:
+                    self._counters["retried"] += 1
+                    task = asyncio.create_task(self._requeue(job, self._backoff(job["attempts"])))
+                    self._delayed.add(task)
+                    task.add_done_callback(self._delayed.discard)
+            finally:
+                self._queue.task_done()
+
+    async def _requeue(self, job: Dict[str, Any], delay: float) -> None:
+        await asyncio.sleep(delay)
+        job["queued_at"] = time.monotonic()
+        await self._queue.put(job)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self._db.jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "run_at": {"$lte": now}},
+                    {"status": "running", "lease_until": {"$lte": now}},
+                ]
+            },
+            {
+                "$set": {"status": "running", "lease_until": now + timedelta(seconds=60)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _durable_worker(self) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Unable to claim job")
+                job = None
+
+            if not job:
+                if not self._accepting:
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._max_wait = max(
+                self._max_wait, (datetime.utcnow() - job["run_at"]).total_seconds()
+            )
+            try:
+                await self._run(job["name"], job.get("payload", {}))
+                await self._db.jobs.delete_one({"_id": job["_id"]})
+                self._counters["completed"] += 1
+            except Exception:
+                if job["attempts"] > self.max_retries:
+                    self._counters["failed"] += 1
+                    logger.exception("Job %s failed after %s attempts", job["name"], job["attempts"])
+                    update = {"status": "failed", "failed_at": datetime.utcnow()}
+                else:
+                    self._counters["retried"] += 1
+                    run_at = datetime.utcnow() + timedelta(seconds=self._backoff(job["attempts"]))
+                    update = {"status": "pending", "run_at": run_at}
+                await self._db.jobs.update_one({"_id": job["_id"]}, {"$set": update})
+
+    async def drain(self, timeout: float) -> None:
+        """Stop accepting jobs and give queued ones `timeout` seconds to finish."""
+        self._accepting = False
+        if self._queue is None:
+            return
+
+        async def _wait_empty() -> None:
+            if self.durable:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+                return
+            # A retry sleeping outside the queue re-enters it later, so keep joining
+            # until neither the queue nor the delayed retries hold anything
+            while True:
+                await self._queue.join()
+                if not self._delayed:
+                    return
+                await asyncio.gather(*list(self._delayed), return_exceptions=True)
+
+        try:
+            await asyncio.wait_for(_wait_empty(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Job queue drain timed out with %s jobs left", self._queue.qsize() + len(self._delayed)
+            )
+        for task in [*self._tasks, *self._delayed]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._delayed, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self) -> Dict[str, Any]:
+        depth = self._queue.qsize() if self._queue is not None and not self.durable else None
+        return {
+            "mode": "durable" if self.durable else "memory",
+            "workers": self.workers,
+            "capacity": self.maxsize,
+            "depth": depth,
+            "utilization": round(depth / self.maxsize, 3) if depth is not None and self.maxsize else None,
+            "in_flight": self._in_flight,
+            "delayed_retries": len(self._delayed),
+            "max_wait_seconds": round(self._max_wait, 3),
+            **self._counters,
+        }
+
+
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    maxsize=settings.job_queue_size,
+    max_retries=settings.job_max_retries,
+    backoff_seconds=settings.job_retry_backoff_seconds,
+    durable=settings.job_queue_durable,
+)
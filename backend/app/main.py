@@ -1,27 +1,83 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from pymongo.errors import PyMongoError
 
+from .admission import AdmissionMiddleware, deadline_http_exception_handler, mongo_error_handler
+from .assignment import scheduler
+from .cache import bus, start_caches
+from .compression import CompressionMiddleware
 from .config import settings
-from .routes import auth, orders, offers, chat
+from .consistency import CausalSessionMiddleware
+from .database import database
+from .dependencies import repos_for
+from .instrumentation import ServerTimingMiddleware
+from .profiling import ProfilingMiddleware
+from .jobs import job_queue
+from .order_log import order_log
+from .routes import admin, auth, chat, dashboard, events, orders, offers
+from .security import start_token_revocation
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start(database.db)
+    await repos_for(database.db).ensure_indexes()
+    order_log.start(repos_for(database.db))
+    # The memory engine runs without Mongo: in-process caches only, no scheduler
+    if settings.storage_engine == "mongo":
+        await start_caches(database.db)
+        await start_token_revocation(database.db)
+        if settings.assign_enabled:
+            scheduler.start(database.db, repos_for(database.db))
+    yield
+    await scheduler.stop()
+    await order_log.stop()
+    # Let queued side effects finish before the worker goes away
+    await job_queue.drain(settings.job_drain_timeout_seconds)
+    await bus.stop()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="YaarFetch API", version="0.1.0")
+    app = FastAPI(title="YaarFetch API", version="0.1.0", lifespan=lifespan)
 
-    # Explicit CORS configuration; wildcard for dev, override with ALLOWED_ORIGINS in prod
+    if settings.causal_sessions_enabled and settings.storage_engine == "mongo":
+        app.add_middleware(CausalSessionMiddleware)
+
+    # Inside the profiler and Server-Timing so compression shows up in both
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+    # Outside the profiler so shed requests cost nothing, inside Server-Timing so they're logged
+    app.add_middleware(AdmissionMiddleware)
+    if settings.server_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware)
+
+    # Explicit CORS configuration; wildcard for dev, override with ALLOWED_ORIGINS in prod.
+    # Outermost, so preflights are answered before admission control can shed them and
+    # 503s from shedding still carry the headers a browser needs to read them.
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Causal-Token"],
     )
 
+    # Mongo timeouts (the request deadline ran out) become 504s
+    app.add_exception_handler(HTTPException, deadline_http_exception_handler)
+    app.add_exception_handler(PyMongoError, mongo_error_handler)
+
     # Routers
     app.include_router(auth.router, prefix="/auth", tags=["auth"])
     app.include_router(orders.router, prefix="/orders", tags=["orders"])
     app.include_router(offers.router, prefix="/offers", tags=["offers"])
     app.include_router(chat.router, prefix="/chat", tags=["chat"])
+    app.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+    app.include_router(events.router, prefix="/events", tags=["events"])
+    app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
     return app
 
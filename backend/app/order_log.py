@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from .config import settings
+from .repositories import Repositories
+
+logger = logging.getLogger(__name__)
+
+Doc = Dict[str, Any]
+
+
+class OrderEventLog:
+    """
+    Write-behind buffer for the append-only `order_events` collection.
+
+    Lifecycle routes record each state change (who moved which field from what to what,
+    and when) here instead of writing it inline. A flusher task writes the buffer with
+    one `insert_many` once `flush_size` events are waiting or every `flush_interval`
+    seconds, so a transition costs the request nothing extra.
+
+    Loss is bounded: at most `max_unflushed` events are ever held in this worker, which
+    is what a crash can lose. When that many are waiting, `record` flushes before it
+    returns instead of growing the buffer; `max_unflushed=0` writes every event through.
+    Event _ids are assigned here, so a batch retried after a failed write can't be
+    inserted twice. Shutdown flushes whatever is left.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, max_unflushed: int, enabled: bool = True) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_unflushed = max_unflushed
+        self.enabled = enabled
+
+        self._repos: Optional[Repositories] = None
+        self._pending: List[Doc] = []
+        self._writing: List[Doc] = []
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {
+            "recorded": 0,
+            "written": 0,
+            "flushes": 0,
+            "write_errors": 0,
+            "backpressure": 0,
+            "dropped": 0,
+        }
+
+    def start(self, repos: Repositories) -> None:
+        self._repos = repos
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._flush_safely()
+        if self._pending:
+            logger.error("Order event log stopped with %s events unwritten", len(self._pending))
+
+    async def record(
+        self,
+        order_id: ObjectId,
+        event: str,
+        actor_id: Optional[ObjectId],
+        field: str,
+        from_value: Any,
+        to_value: Any,
+    ) -> None:
+        """Append one state change; `actor_id` is None for changes made by the system."""
+        if not self.enabled:
+            return
+        self._pending.append(
+            {
+                "_id": ObjectId(),
+                "order_id": order_id,
+                "event": event,
+                "actor_id": actor_id,
+                "field": field,
+                "from_value": from_value,
+                "to_value": to_value,
+                "at": datetime.utcnow(),
+            }
+        )
+        self._counters["recorded"] += 1
+        if self._repos is None:
+            # Not started (e.g. the app served without its lifespan): keep what fits
+            self._trim()
+        elif len(self._pending) + len(self._writing) > self.max_unflushed:
+            if self.max_unflushed:
+                self._counters["backpressure"] += 1
+            await self._flush_safely()
+        elif len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+
+    def pending_for(self, order_id: ObjectId) -> List[Doc]:
+        """Events for `order_id` recorded in this worker but not written yet."""
+        return [event for event in (*self._writing, *self._pending) if event["order_id"] == order_id]
+
+    async def flush(self) -> None:
+        """Write everything recorded so far; raises if a write fails (the events stay buffered)."""
+        async with self._lock:
+            while self._pending and self._repos is not None:
+                batch, self._pending = self._pending, []
+                self._writing = batch
+                try:
+                    await self._repos.orders.append_events(batch)
+                except BaseException:
+                    # Back in front of anything recorded meanwhile, to be retried
+                    self._pending = batch + self._pending
+                    raise
+                finally:
+                    self._writing = []
+                self._counters["written"] += len(batch)
+                self._counters["flushes"] += 1
+
+    async def _flush_safely(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            self._counters["write_errors"] += 1
+            logger.exception("Writing %s order events failed", len(self._pending))
+            self._trim()
+
+    def _trim(self) -> None:
+        # While writes fail the buffer still can't grow past the bound; the oldest events go
+        excess = len(self._pending) - max(self.max_unflushed, self.flush_size)
+        if excess > 0:
+            del self._pending[:excess]
+            self._counters["dropped"] += excess
+            logger.error("Dropped %s order events that could not be written", excess)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_safely()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._pending) + len(self._writing),
+            "flush_size": self.flush_size,
+            "flush_interval_seconds": self.flush_interval,
+            "max_unflushed": self.max_unflushed,
+            **self._counters,
+        }
+
+
+order_log = OrderEventLog(
+    flush_size=settings.order_log_flush_size,
+    flush_interval=settings.order_log_flush_interval_seconds,
+    max_unflushed=settings.order_log_max_unflushed,
+    enabled=settings.order_log_enabled,
+)
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from .cache import get_cache
+from .config import settings
+from .projections import ORDER_PARTICIPANTS
+from .repositories import Repositories
+from .utils import object_id_to_str
+
+# order_id -> {"requester_id", "fetcher_id"}. Participants only change in accept_order,
+# which refreshes the entry here and invalidates it in the other workers.
+participant_cache = get_cache(
+    "order_participants",
+    ttl=settings.participant_cache_ttl_seconds,
+    max_entries=settings.participant_cache_size,
+)
+
+
+def participants_of(order: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {
+        "requester_id": object_id_to_str(order["requester_id"]),
+        "fetcher_id": object_id_to_str(order["fetcher_id"]) if order.get("fetcher_id") else None,
+    }
+
+
+async def get_participants(
+    repos: Repositories, oid: ObjectId, user_id: Optional[str] = None
+) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Participants of an order, or None if it doesn't exist.
+
+    With `user_id`, a cached entry that doesn't list that user is checked against Mongo
+    before it's believed: a copy loaded just before accept_order (in another worker, or
+    in the shared backend) would otherwise lock the new fetcher out for a whole TTL.
+    Refusals are rare, so the extra read is cheap.
+    """
+
+    async def load():
+        order = await repos.orders.get(oid, ORDER_PARTICIPANTS, include_archived=True)
+        return participants_of(order) if order else None
+
+    participants = await participant_cache.get_or_load(str(oid), load)
+    if user_id is None or participants is None or user_id in participants.values():
+        return participants
+    since = participant_cache.snapshot()
+    fresh = await load()
+    if fresh is not None and fresh != participants:
+        await participant_cache.set(str(oid), fresh, since=since)
+    return fresh
+
+
+async def remember_participants(order: Dict[str, Any]) -> None:
+    """Prime the cache for a brand-new order; nobody else can hold a copy yet."""
+    await participant_cache.set(str(order["_id"]), participants_of(order))
+
+
+async def update_participants(order: Dict[str, Any], broadcast: bool = True) -> None:
+    await update_participants_many([order], broadcast)
+
+
+async def update_participants_many(orders: List[Dict[str, Any]], broadcast: bool = True) -> None:
+    """Refresh this worker's entries; `broadcast=False` leaves telling the others to the caller."""
+    await participant_cache.invalidate_many([str(order["_id"]) for order in orders], broadcast)
+    for order in orders:
+        await participant_cache.set(str(order["_id"]), participants_of(order))
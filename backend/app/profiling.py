@@ -0,0 +1,235 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Dict, Optional
+
+from .config import settings
+
+
+class _Profiled:
+    """
+    Awaits `coro` with `profile` enabled only while `coro` itself is running.
+
+    cProfile hooks the whole thread, and a request's coroutine gives the loop to other
+    tasks at every await. Driving the coroutine one step at a time and enabling the
+    profiler around each step keeps those other requests out of this request's stats.
+    Steps of different requests never overlap, so several can be profiled at once.
+    """
+
+    def __init__(self, coro: Awaitable[Any], profile: cProfile.Profile) -> None:
+        self.coro = coro
+        self.profile = profile
+
+    def __await__(self):
+        coro = self.coro.__await__()
+        value: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            self.profile.enable()
+            try:
+                step = coro.throw(error) if error is not None else coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profile.disable()
+            try:
+                value, error = (yield step), None
+            except BaseException as exc:  # cancellation and the like go to the request
+                value, error = None, exc
+
+
+class ProfileSession:
+    """
+    One bounded profiling run: either cProfile of each matching request's own code
+    (see `_Profiled`), or a statistical sampler of the event loop thread while a
+    matching request is in flight. Sampling sees the whole thread, so its stacks include
+    whatever else the worker was doing meanwhile. Ends after `max_requests` matching
+    requests or `seconds`, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        route: Optional[str],
+        max_requests: Optional[int],
+        seconds: float,
+        interval_ms: float,
+    ) -> None:
+        self.mode = mode
+        self.method, self.path_prefix = self._parse_route(route)
+        self.max_requests = max_requests
+        self.deadline = time.monotonic() + seconds
+        self.interval = interval_ms / 1000
+        self.started_at = time.time()
+        self.requests = 0
+        self.skipped = 0
+        self.finished = False
+
+        self.stats: Optional[pstats.Stats] = None
+        self.samples: Counter = Counter()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        if mode == "sample":
+            self._loop_thread = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+
+    @staticmethod
+    def _parse_route(route: Optional[str]):
+        # "GET /orders" or just "/orders"; matched as a method + path prefix
+        if not route:
+            return None, "/"
+        method, _, path = route.strip().partition(" ")
+        if not path:
+            return None, method
+        return method.upper(), path
+
+    def matches(self, scope) -> bool:
+        if self.method and scope.get("method") != self.method:
+            return False
+        path = scope.get("path", "")
+        return path.startswith(self.path_prefix) and not path.startswith("/admin")
+
+    @property
+    def full(self) -> bool:
+        return self.max_requests is not None and self.requests >= self.max_requests
+
+    @property
+    def expired(self) -> bool:
+        # With a request budget the session ends once the last counted request returns
+        return time.monotonic() >= self.deadline or (self.full and not self._in_flight)
+
+    def finish(self) -> None:
+        self.finished = True
+        self._stop.set()
+
+    def _sample(self) -> None:
+        max_depth = settings.profile_max_stack_depth
+        while not self._stop.wait(self.interval):
+            if self.expired:
+                self.finish()
+                return
+            if not self._in_flight:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = []
+            while frame is not None and len(stack) < max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            # Bound memory: once full, only stacks already seen keep counting
+            if key in self.samples or len(self.samples) < settings.profile_max_stacks:
+                self.samples[key] += 1
+
+    async def run(self, app, scope, receive, send) -> None:
+        with self._lock:
+            counted = not self.full
+            if counted:
+                self.requests += 1
+                self._in_flight += 1
+            else:
+                self.skipped += 1
+        if not counted:
+            await app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile() if self.mode == "cprofile" else None
+        try:
+            if profile is not None:
+                await _Profiled(app(scope, receive, send), profile)
+            else:
+                await app(scope, receive, send)
+        finally:
+            with self._lock:
+                if profile is not None:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+                self._in_flight -= 1
+            if self.expired:
+                self.finish()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "method": self.method,
+            "path_prefix": self.path_prefix,
+            "requests": self.requests,
+            "max_requests": self.max_requests,
+            "skipped": self.skipped,
+            "seconds_left": max(round(self.deadline - time.monotonic(), 1), 0),
+            "samples": sum(self.samples.values()),
+            "finished": self.finished or self.expired,
+        }
+
+    def pstats_dump(self) -> bytes:
+        # Same format as cProfile's -o output; loads with pstats.Stats(path) or snakeviz
+        return marshal.dumps(self.stats.stats) if self.stats else b""
+
+    def pstats_text(self, limit: int = 50) -> str:
+        if not self.stats:
+            return ""
+        buffer = io.StringIO()
+        self.stats.stream = buffer
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        return buffer.getvalue()
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's collapsed-stack format, ready for flamegraph.pl or speedscope
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class Profiler:
+    def __init__(self) -> None:
+        # `session` keeps the last run's results; `running` is what the middleware checks
+        self.session: Optional[ProfileSession] = None
+        self.running: Optional[ProfileSession] = None
+
+    def start(self, **options: Any) -> ProfileSession:
+        self.stop()
+        self.session = self.running = ProfileSession(**options)
+        return self.session
+
+    def stop(self) -> None:
+        if self.running is not None:
+            self.running.finish()
+        self.running = None
+
+    def active(self, scope) -> Optional[ProfileSession]:
+        session = self.running
+        if session is None:
+            return None
+        if session.finished or session.expired:
+            self.stop()
+            return None
+        return session if session.matches(scope) else None
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """Costs one attribute check per request unless an admin has started a session."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if profiler.running is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        session = profiler.active(scope)
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        await session.run(self.app, scope, receive, send)
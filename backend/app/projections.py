@@ -0,0 +1,70 @@
+"""
+Projection catalog: the fields each use case reads, so no query pulls whole documents
+(password hashes, bank details) just to look at one or two fields.
+
+Every query in dependencies.py and routes/*.py should pass one of these. When a
+converter in utils.py starts reading a new field, add it here too.
+"""
+
+from .utils import PAYOUT_FIELDS
+
+
+def _fields(*names: str) -> dict:
+    return {name: 1 for name in names}
+
+
+# Existence checks that only need the _id back
+ID_ONLY = {"_id": 1}
+
+# users
+USER_PUBLIC = _fields("name", "email")  # user_to_public / get_current_user
+USER_LOGIN = _fields("name", "email", "password")
+USER_CONTACT = _fields("name", "phone_number")  # enrich_orders
+
+# orders
+ORDER_PARTICIPANTS = _fields("requester_id", "fetcher_id")  # authorization checks
+ORDER_SUMMARY = _fields(  # order_to_public, listings and lifecycle responses
+    "item",
+    "dropoff_location",
+    "instructions",
+    "requester_id",
+    "fetcher_id",
+    "target_offer_id",
+    "status",
+    "created_at",
+    "payment_sent",
+    "payout_status",
+)
+ORDER_TRANSITION = _fields("requester_id", "fetcher_id", "status")  # bulk status updates
+ORDER_ASSIGNMENT = _fields(  # assignment scheduler
+    "requester_id", "dropoff_location", "target_fetcher_id", "target_offer_id", "created_at"
+)
+# Detail reads also pick up payout fields still stored inline on unmigrated orders
+ORDER_DETAIL = {**ORDER_SUMMARY, **_fields(*PAYOUT_FIELDS)}
+
+# order_events
+ORDER_EVENT_PUBLIC = _fields(  # order_event_to_public
+    "order_id", "event", "actor_id", "field", "from_value", "to_value", "at"
+)
+
+# payouts
+PAYOUT_DETAIL = _fields(*PAYOUT_FIELDS)  # payout_to_public
+
+# offers
+OFFER_OWNER = _fields("fetcher_id")
+OFFER_ASSIGNMENT = _fields("fetcher_id", "destination", "delivery_charge")
+OFFER_PUBLIC = _fields(  # offer_to_public
+    "fetcher_id",
+    "current_location",
+    "destination",
+    "arrival_time",
+    "pickup_capability",
+    "contact_number",
+    "delivery_charge",
+    "estimated_delivery_time",
+    "notes",
+    "created_at",
+)
+
+# chats
+CHAT_PUBLIC = _fields("order_id", "sender_id", "sender_name", "content", "created_at")
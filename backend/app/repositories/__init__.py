@@ -0,0 +1,21 @@
+"""
+Repository layer between the routes and storage.
+
+Routes get a `Repositories` from the `get_repos` dependency instead of a Motor database.
+STORAGE_ENGINE picks the engine: `mongo` (Motor) or `memory`, which runs the same
+filters, sorts and conditional updates on in-process dicts for tests and for
+benchmarking handler and serialization cost without Mongo.
+"""
+
+from .repos import ChatRepo, OfferRepo, OrderRepo, Repositories, UserRepo
+from .stores import MemoryStore, MotorStore
+
+__all__ = [
+    "ChatRepo",
+    "MemoryStore",
+    "MotorStore",
+    "OfferRepo",
+    "OrderRepo",
+    "Repositories",
+    "UserRepo",
+]
@@ -0,0 +1,234 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from ..projections import ID_ONLY
+from .stores import Doc, Sort
+
+logger = logging.getLogger(__name__)
+
+NEWEST_FIRST: Sort = [("created_at", -1)]
+
+# Emails compare case-insensitively; lookups must pass the same collation to use the index
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+
+
+class UserRepo:
+    def __init__(self, store) -> None:
+        self.users = store.collection("users")
+        self.revoked_tokens = store.collection("revoked_tokens")
+        # Set once ensure_indexes has the unique email index in place
+        self.email_index_ready = False
+
+    async def get(self, user_id: ObjectId, projection: Doc) -> Optional[Doc]:
+        return await self.users.find_one({"_id": user_id}, projection)
+
+    async def get_many(self, user_ids: Iterable[ObjectId], projection: Doc) -> List[Doc]:
+        return await self.users.find({"_id": {"$in": list(user_ids)}}, projection)
+
+    async def find_by_email(self, email: str, projection: Doc) -> Optional[Doc]:
+        return await self.users.find_one({"email": email}, projection, collation=EMAIL_COLLATION)
+
+    async def insert(self, doc: Doc) -> Doc:
+        """Raises DuplicateKeyError when the email is taken, in any letter case."""
+        if not self.email_index_ready and await self.find_by_email(doc["email"], ID_ONLY):
+            # Without the index, a lookup first is the only check there is; it can't stop
+            # two concurrent signups, but it stops every sequential duplicate
+            raise DuplicateKeyError(f"Email {doc['email']!r} already registered", 11000)
+        doc["_id"] = await self.users.insert_one(doc)
+        return doc
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.users.create_index(
+                [("email", 1)], name="email_unique_ci", unique=True, collation=EMAIL_COLLATION
+            )
+            self.email_index_ready = True
+        except DuplicateKeyError as exc:
+            # Accounts created before the index may differ only in case; serve traffic
+            # anyway, with registration looking the email up before inserting until
+            # they're merged and the index can be built
+            logger.error("Cannot create the unique email index: %s", exc)
+
+    async def revoke_token(self, digest: str, user_id: ObjectId, expires_at: datetime) -> None:
+        await self.revoked_tokens.update_one(
+            {"_id": digest},
+            {"$setOnInsert": {"user_id": user_id, "expires_at": expires_at}},
+            upsert=True,
+        )
+
+    async def is_token_revoked(self, digest: str) -> bool:
+        return await self.revoked_tokens.find_one({"_id": digest}, ID_ONLY) is not None
+
+
+class OrderRepo:
+    """Orders, their archive (see archive.py), payment/payout details and event log."""
+
+    def __init__(self, store) -> None:
+        self.orders = store.collection("orders")
+        self.archive = store.collection("orders_archive")
+        self.payouts = store.collection("payouts")
+        self.events = store.collection("order_events")
+
+    async def ensure_indexes(self) -> None:
+        await self.events.create_index([("order_id", 1), ("at", 1)], name="order_id_at")
+
+    async def insert(self, doc: Doc) -> Doc:
+        doc["_id"] = await self.orders.insert_one(doc)
+        return doc
+
+    async def insert_many(self, docs: List[Doc]) -> List[Doc]:
+        """One unordered bulk insert; _ids are assigned here so each doc carries its own."""
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        await self.orders.insert_many(docs)
+        return docs
+
+    async def get(self, order_id: ObjectId, projection: Doc, include_archived: bool = False) -> Optional[Doc]:
+        order = await self.orders.find_one({"_id": order_id}, projection)
+        if order is None and include_archived:
+            order = await self.archive.find_one({"_id": order_id}, projection)
+        return order
+
+    async def find(
+        self, query: Doc, projection: Doc, limit: int = 100, include_archived: bool = False
+    ) -> List[Doc]:
+        """Newest first. With `include_archived` both collections are read and merged."""
+        orders = await self.orders.find(query, projection, NEWEST_FIRST, limit)
+        if include_archived:
+            orders += await self.archive.find(query, projection, NEWEST_FIRST, limit)
+            orders = sorted(orders, key=lambda o: o["created_at"], reverse=True)[:limit]
+        return orders
+
+    async def update(self, order_id: ObjectId, changes: Doc, projection: Doc, guard: Optional[Doc] = None) -> Optional[Doc]:
+        """
+        Set `changes` and return the updated order, or None when it doesn't exist or no
+        longer matches `guard` (e.g. {"status": "open"}), checked atomically with the write.
+        """
+        return await self.orders.find_one_and_update(
+            {"_id": order_id, **(guard or {})}, {"$set": changes}, projection
+        )
+
+    async def transition(
+        self, order_id: ObjectId, changes: Doc, projection: Doc, guard: Optional[Doc] = None
+    ) -> Optional[Tuple[Doc, Doc]]:
+        """`update` that returns the order as it was before as well as after, for the event log."""
+        before = await self.orders.find_one_and_update(
+            {"_id": order_id, **(guard or {})}, {"$set": changes}, projection, before=True
+        )
+        if before is None:
+            return None
+        return before, {**before, **changes}
+
+    async def open_for_assignment(self, projection: Doc, limit: int) -> List[Doc]:
+        """Unassigned open orders, oldest first, so a capped batch drops the newest."""
+        return await self.orders.find({"status": "open", "fetcher_id": None}, projection, [("created_at", 1)], limit)
+
+    async def transition_many(
+        self, items: List[Tuple[ObjectId, Doc, Doc]], projection: Doc
+    ) -> Dict[ObjectId, Doc]:
+        """
+        Apply each (order_id, changes, guard) whose guard still holds, in one unordered bulk
+        write. Returns the orders that were updated, by _id; the rest no longer matched their
+        guard. A bulk write only reports how many matched, so one read afterwards counts an
+        order as updated when it now holds its changes. An order another request moved on
+        again in between reads as not updated, which callers report as a conflict to retry.
+        """
+        await self.orders.bulk_update(
+            [({"_id": order_id, **guard}, {"$set": changes}) for order_id, changes, guard in items]
+        )
+        wanted = {order_id: changes for order_id, changes, _ in items}
+        current = await self.orders.find(
+            {"_id": {"$in": list(wanted)}},
+            {**projection, **{field: 1 for _, changes, _ in items for field in changes}},
+            limit=len(wanted),
+        )
+        return {
+            order["_id"]: order
+            for order in current
+            if all(order.get(field) == value for field, value in wanted[order["_id"]].items())
+        }
+
+    async def append_events(self, events: List[Doc]) -> int:
+        return await self.events.insert_many(events)
+
+    async def timeline(self, order_id: ObjectId, projection: Doc, limit: int = 1000) -> List[Doc]:
+        return await self.events.find({"order_id": order_id}, projection, [("at", 1), ("_id", 1)], limit)
+
+    async def get_payout(self, order_id: ObjectId, projection: Doc) -> Optional[Doc]:
+        return await self.payouts.find_one({"_id": order_id}, projection)
+
+    async def save_payout(self, order_id: ObjectId, fields: Doc, projection: Doc) -> Doc:
+        return await self.payouts.find_one_and_update(
+            {"_id": order_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            projection,
+            upsert=True,
+        )
+
+
+class OfferRepo:
+    def __init__(self, store) -> None:
+        self.offers = store.collection("offers")
+
+    async def insert(self, doc: Doc) -> Doc:
+        doc["_id"] = await self.offers.insert_one(doc)
+        return doc
+
+    async def get(self, offer_id: ObjectId, projection: Doc) -> Optional[Doc]:
+        return await self.offers.find_one({"_id": offer_id}, projection)
+
+    async def find(self, query: Doc, projection: Doc, limit: int = 50) -> List[Doc]:
+        return await self.offers.find(query, projection, NEWEST_FIRST, limit)
+
+    async def posted_since(self, since: datetime, projection: Doc, limit: int) -> List[Doc]:
+        """Offers posted after `since`, newest first, so a capped batch drops the oldest."""
+        return await self.find({"created_at": {"$gte": since}}, projection, limit)
+
+    async def update(self, offer_id: ObjectId, changes: Doc, projection: Doc) -> Optional[Doc]:
+        return await self.offers.find_one_and_update({"_id": offer_id}, {"$set": changes}, projection)
+
+    async def delete(self, offer_id: ObjectId) -> bool:
+        return bool(await self.offers.delete_one({"_id": offer_id}))
+
+
+class ChatRepo:
+    def __init__(self, store) -> None:
+        self.chats = store.collection("chats")
+        self.archive = store.collection("chats_archive")
+
+    async def insert(self, doc: Doc) -> Doc:
+        doc["_id"] = await self.chats.insert_one(doc)
+        return doc
+
+    async def for_order(
+        self, order_id: ObjectId, projection: Doc, limit: int = 1000, include_archived: bool = False
+    ) -> List[Doc]:
+        """
+        Oldest first. Settled orders have their messages in the archive, but participants
+        can still post to them, so with `include_archived` both collections are merged.
+        """
+        oldest_first: Sort = [("created_at", 1)]
+        chats = await self.chats.find({"order_id": order_id}, projection, oldest_first, limit)
+        if include_archived:
+            chats += await self.archive.find({"order_id": order_id}, projection, oldest_first, limit)
+            chats = sorted(chats, key=lambda chat: chat["created_at"])[:limit]
+        return chats
+
+
+class Repositories:
+    """The repositories for one storage engine, as handed to routes by `get_repos`."""
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self.users = UserRepo(store)
+        self.orders = OrderRepo(store)
+        self.offers = OfferRepo(store)
+        self.chats = ChatRepo(store)
+
+    async def ensure_indexes(self) -> None:
+        await self.users.ensure_indexes()
+        await self.orders.ensure_indexes()
@@ -0,0 +1,387 @@
+"""
+Storage engines behind the repositories.
+
+A store hands out collections with a small async API (find_one, find, insert_one,
+insert_many, find_one_and_update, update_one, bulk_update, delete_one, create_index). `MotorStore` maps it straight
+onto Motor. `MemoryStore` keeps documents in dicts and evaluates the subset of Mongo's
+query and update language the repositories use, including unique indexes and
+case-insensitive collations, so handlers can be run and benchmarked without a database.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+Doc = Dict[str, Any]
+Sort = Sequence[Tuple[str, int]]
+
+
+class MotorCollection:
+    def __init__(self, collection) -> None:
+        self.collection = collection
+
+    async def find_one(
+        self, filter: Doc, projection: Optional[Doc] = None, collation: Optional[Doc] = None
+    ) -> Optional[Doc]:
+        return await self.collection.find_one(filter, projection, collation=collation)
+
+    async def find(
+        self,
+        filter: Doc,
+        projection: Optional[Doc] = None,
+        sort: Optional[Sort] = None,
+        limit: int = 0,
+        collation: Optional[Doc] = None,
+    ) -> List[Doc]:
+        cursor = self.collection.find(filter, projection, collation=collation)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=limit or None)
+
+    async def insert_one(self, doc: Doc) -> ObjectId:
+        result = await self.collection.insert_one(doc)
+        return result.inserted_id
+
+    async def insert_many(self, docs: List[Doc]) -> int:
+        """Insert what isn't there yet; documents whose _id exists are skipped, so retrying a batch is safe."""
+        try:
+            result = await self.collection.insert_many(docs, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as exc:
+            if any(error["code"] != 11000 for error in exc.details["writeErrors"]):
+                raise
+            return exc.details["nInserted"]
+
+    async def find_one_and_update(
+        self,
+        filter: Doc,
+        update: Doc,
+        projection: Optional[Doc] = None,
+        upsert: bool = False,
+        before: bool = False,
+    ) -> Optional[Doc]:
+        """The document after the update, or as it was before it with `before=True`."""
+        return await self.collection.find_one_and_update(
+            filter,
+            update,
+            projection=projection,
+            upsert=upsert,
+            return_document=ReturnDocument.BEFORE if before else ReturnDocument.AFTER,
+        )
+
+    async def update_one(self, filter: Doc, update: Doc, upsert: bool = False) -> int:
+        result = await self.collection.update_one(filter, update, upsert=upsert)
+        return result.matched_count
+
+    async def bulk_update(self, updates: List[Tuple[Doc, Doc]]) -> int:
+        """Apply (filter, update) pairs in one unordered bulk_write; returns how many matched."""
+        if not updates:
+            return 0
+        result = await self.collection.bulk_write([UpdateOne(f, u) for f, u in updates], ordered=False)
+        return result.matched_count
+
+    async def delete_one(self, filter: Doc) -> int:
+        result = await self.collection.delete_one(filter)
+        return result.deleted_count
+
+    async def create_index(
+        self, keys: Sort, name: str, unique: bool = False, collation: Optional[Doc] = None
+    ) -> None:
+        options: Doc = {"name": name, "unique": unique}
+        if collation:
+            options["collation"] = collation
+        await self.collection.create_index(list(keys), **options)
+
+
+class MotorStore:
+    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+        self.db = db
+
+    def collection(self, name: str) -> MotorCollection:
+        return MotorCollection(self.db[name])
+
+
+_MISSING = object()
+
+
+def _get(doc: Doc, field: str) -> Any:
+    value: Any = doc
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _case_insensitive(collation: Optional[Doc]) -> bool:
+    # Strength 1 and 2 ignore case; diacritics (which strength 1 also ignores) are compared
+    return bool(collation) and collation.get("strength", 3) <= 2
+
+
+def _fold(value: Any, fold: bool) -> Any:
+    return value.casefold() if fold and isinstance(value, str) else value
+
+
+def _equals(value: Any, expected: Any, fold: bool = False) -> bool:
+    # Like Mongo, {"field": None} also matches documents without the field
+    if expected is None:
+        return value is _MISSING or value is None
+    return value is not _MISSING and _fold(value, fold) == _fold(expected, fold)
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+
+def _matches_condition(value: Any, condition: Any, fold: bool = False) -> bool:
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return _equals(value, condition, fold)
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = _equals(value, operand, fold)
+        elif op == "$ne":
+            ok = not _equals(value, operand, fold)
+        elif op == "$in":
+            ok = any(_equals(value, item, fold) for item in operand)
+        elif op == "$nin":
+            ok = not any(_equals(value, item, fold) for item in operand)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = _compare(value, op, operand)
+        else:
+            raise NotImplementedError(f"MemoryStore does not support {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: Doc, filter: Doc, fold: bool = False) -> bool:
+    """Whether `doc` matches `filter`; `fold` compares strings case-insensitively."""
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches(doc, clause, fold) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, clause, fold) for clause in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"MemoryStore does not support {key}")
+        elif not _matches_condition(_get(doc, key), condition, fold):
+            return False
+    return True
+
+
+def project(doc: Doc, projection: Optional[Doc]) -> Doc:
+    if not projection:
+        return dict(doc)
+    projected = {field: doc[field] for field, include in projection.items() if include and field in doc}
+    if projection.get("_id", 1) and "_id" in doc:
+        projected["_id"] = doc["_id"]
+    return projected
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Missing and null sort before everything else, as in Mongo
+    return (0, 0) if value is _MISSING or value is None else (1, value)
+
+
+def apply_update(doc: Doc, update: Doc, inserting: bool = False) -> None:
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            doc.update(fields)
+        elif op == "$setOnInsert":
+            continue
+        elif op == "$unset":
+            for field in fields:
+                doc.pop(field, None)
+        elif op == "$inc":
+            for field, amount in fields.items():
+                doc[field] = doc.get(field, 0) + amount
+        else:
+            raise NotImplementedError(f"MemoryStore does not support {op}")
+
+
+class _UniqueIndex:
+    def __init__(self, name: str, fields: List[str], fold: bool) -> None:
+        self.name = name
+        self.fields = fields
+        self.fold = fold
+        self.owners: Dict[Tuple[Any, ...], Any] = {}  # index key -> _id
+
+    def key(self, doc: Doc) -> Tuple[Any, ...]:
+        # Missing fields index as null, so only one document may lack them, as in Mongo
+        values = (_get(doc, field) for field in self.fields)
+        return tuple(None if value is _MISSING else _fold(value, self.fold) for value in values)
+
+
+class MemoryCollection:
+    """
+    Documents keyed by _id, in insertion order. No method awaits before it has finished
+    reading and writing, so each call is atomic with respect to other coroutines, which
+    is what conditional updates such as accept_order's and unique indexes rely on.
+    """
+
+    def __init__(self) -> None:
+        self.docs: Dict[Any, Doc] = {}
+        self.unique_indexes: Dict[str, _UniqueIndex] = {}
+
+    async def find_one(
+        self, filter: Doc, projection: Optional[Doc] = None, collation: Optional[Doc] = None
+    ) -> Optional[Doc]:
+        for doc in self._matching(filter, collation):
+            return project(doc, projection)
+        return None
+
+    async def find(
+        self,
+        filter: Doc,
+        projection: Optional[Doc] = None,
+        sort: Optional[Sort] = None,
+        limit: int = 0,
+        collation: Optional[Doc] = None,
+    ) -> List[Doc]:
+        docs = list(self._matching(filter, collation))
+        # Stable sorts applied last key first give a multi-key sort
+        for field, direction in reversed(list(sort or ())):
+            docs.sort(key=lambda doc: _sort_key(_get(doc, field)), reverse=direction < 0)
+        if limit:
+            docs = docs[:limit]
+        return [project(doc, projection) for doc in docs]
+
+    async def insert_one(self, doc: Doc) -> ObjectId:
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError(f"Duplicate _id {doc['_id']}", 11000)
+        stored = dict(doc)
+        self._index(stored, None)
+        self.docs[doc["_id"]] = stored
+        return doc["_id"]
+
+    async def insert_many(self, docs: List[Doc]) -> int:
+        inserted = 0
+        for doc in docs:
+            try:
+                await self.insert_one(doc)
+                inserted += 1
+            except DuplicateKeyError:
+                continue
+        return inserted
+
+    async def find_one_and_update(
+        self,
+        filter: Doc,
+        update: Doc,
+        projection: Optional[Doc] = None,
+        upsert: bool = False,
+        before: bool = False,
+    ) -> Optional[Doc]:
+        previous = None
+        if before:
+            match = next(self._matching(filter), None)
+            previous = dict(match) if match is not None else None
+        doc, _ = self._update(filter, update, upsert)
+        if before:
+            doc = previous
+        return project(doc, projection) if doc is not None else None
+
+    async def update_one(self, filter: Doc, update: Doc, upsert: bool = False) -> int:
+        _, matched = self._update(filter, update, upsert)
+        return matched
+
+    async def bulk_update(self, updates: List[Tuple[Doc, Doc]]) -> int:
+        return sum(self._update(filter, update, False)[1] for filter, update in updates)
+
+    async def delete_one(self, filter: Doc) -> int:
+        doc = next(self._matching(filter), None)
+        if doc is None:
+            return 0
+        for index in self.unique_indexes.values():
+            index.owners.pop(index.key(doc), None)
+        del self.docs[doc["_id"]]
+        return 1
+
+    async def create_index(
+        self, keys: Sort, name: str, unique: bool = False, collation: Optional[Doc] = None
+    ) -> None:
+        # Only unique indexes change behaviour here; lookups are scans either way
+        if not unique or name in self.unique_indexes:
+            return
+        index = _UniqueIndex(name, [field for field, _ in keys], _case_insensitive(collation))
+        for doc in self.docs.values():
+            key = index.key(doc)
+            if key in index.owners:
+                raise DuplicateKeyError(f"Duplicate key {key} for index {name}", 11000)
+            index.owners[key] = doc["_id"]
+        self.unique_indexes[name] = index
+
+    def _matching(self, filter: Doc, collation: Optional[Doc] = None):
+        if "_id" in filter and not isinstance(filter["_id"], dict):
+            doc = self.docs.get(filter["_id"])
+            candidates = [doc] if doc is not None else []
+        else:
+            candidates = list(self.docs.values())
+        fold = _case_insensitive(collation)
+        return (doc for doc in candidates if matches(doc, filter, fold))
+
+    def _index(self, doc: Doc, previous: Optional[Doc]) -> None:
+        """Claim `doc`'s unique keys (releasing `previous`'s), or raise without changing anything."""
+        claims = []
+        for index in self.unique_indexes.values():
+            key = index.key(doc)
+            owner = index.owners.get(key)
+            if owner is not None and owner != doc["_id"]:
+                raise DuplicateKeyError(f"Duplicate key {key} for index {index.name}", 11000)
+            claims.append((index, key))
+        for index, key in claims:
+            if previous is not None:
+                index.owners.pop(index.key(previous), None)
+            index.owners[key] = doc["_id"]
+
+    def _update(self, filter: Doc, update: Doc, upsert: bool) -> Tuple[Optional[Doc], int]:
+        doc = next(self._matching(filter), None)
+        if doc is not None:
+            updated = dict(doc)
+            apply_update(updated, update)
+            self._index(updated, doc)
+            doc.clear()
+            doc.update(updated)
+            return doc, 1
+        if not upsert:
+            return None, 0
+        doc = {
+            key: value
+            for key, value in filter.items()
+            if not key.startswith("$") and not isinstance(value, dict)
+        }
+        doc.setdefault("_id", ObjectId())
+        apply_update(doc, update, inserting=True)
+        self._index(doc, None)
+        self.docs[doc["_id"]] = doc
+        return doc, 0
+
+
+class MemoryStore:
+    def __init__(self) -> None:
+        self.collections: Dict[str, MemoryCollection] = {}
+
+    def collection(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection()
+        return self.collections[name]
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse, Response
+
+from ..admission import admission
+from ..assignment import scheduler
+from ..archive import last_run as last_archive_run
+from ..cache import cache_metrics
+from ..compression import compression_metrics
+from ..config import settings
+from ..dependencies import get_admin_user
+from ..events import broker
+from ..instrumentation import TimedRoute
+from ..jobs import job_queue
+from ..order_log import order_log
+from ..profiling import profiler
+from ..schemas import ArchiveRun, ProfileStart
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/metrics")
+async def get_metrics(admin_user=Depends(get_admin_user)):
+    return {
+        "jobs": job_queue.metrics(),
+        "events": broker.metrics(),
+        "caches": cache_metrics(),
+        "archive": last_archive_run,
+        "admission": admission.metrics(),
+        "assignment": scheduler.metrics(),
+        "order_events": order_log.metrics(),
+        "compression": compression_metrics(),
+    }
+
+
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+async def start_archive(payload: ArchiveRun, admin_user=Depends(get_admin_user)):
+    queued = await job_queue.enqueue("archive_orders", **payload.model_dump(exclude_none=True))
+    if not queued:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue is full")
+    return {"queued": True}
+
+
+@router.post("/profile", status_code=status.HTTP_201_CREATED)
+async def start_profile(payload: ProfileStart, admin_user=Depends(get_admin_user)):
+    requests = payload.requests
+    if requests is None or requests > settings.profile_max_requests:
+        requests = settings.profile_max_requests
+    session = profiler.start(
+        mode=payload.mode,
+        route=payload.route,
+        max_requests=requests,
+        seconds=min(payload.seconds, settings.profile_max_seconds),
+        interval_ms=max(payload.interval_ms, settings.profile_min_interval_ms),
+    )
+    return session.status()
+
+
+@router.get("/profile")
+async def get_profile(admin_user=Depends(get_admin_user)):
+    if profiler.session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profiling session")
+    return profiler.session.status()
+
+
+@router.delete("/profile", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_profile(admin_user=Depends(get_admin_user)):
+    profiler.stop()
+
+
+@router.get("/profile/result")
+async def get_profile_result(format: str = "text", admin_user=Depends(get_admin_user)):
+    session = profiler.session
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profiling session")
+
+    if format == "collapsed":
+        if session.mode != "sample":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Collapsed stacks need a session started with mode=sample",
+            )
+        return PlainTextResponse(session.collapsed())
+    if session.mode != "cprofile":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="pstats output needs a session started with mode=cprofile",
+        )
+    if format == "pstats":
+        return Response(
+            session.pstats_dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="yaarfetch.prof"'},
+        )
+    if format == "text":
+        return PlainTextResponse(session.pstats_text())
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="format must be text, pstats or collapsed"
+    )
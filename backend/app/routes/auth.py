@@ -1,25 +1,28 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-
-from ..dependencies import get_current_user, get_db
+from pymongo.errors import DuplicateKeyError
+from ..dependencies import get_current_user, get_repos, oauth2_scheme
+from ..instrumentation import TimedRoute
+from ..projections import USER_LOGIN
+from ..repositories import Repositories
 from ..schemas import Token, UserCreate, UserLogin, UserPublic
-from ..security import create_access_token, get_password_hash, verify_password
-from ..utils import object_id_to_str, user_to_public
+from ..security import (
+    create_access_token,
+    forget_token,
+    get_password_hash,
+    token_digest,
+    verify_password,
+    verify_token,
+)
+from ..utils import object_id_to_str, to_object_id, user_to_public
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register_user(payload: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def register_user(payload: UserCreate, repos: Repositories = Depends(get_repos)):
     try:
-        existing = await db.users.find_one({"email": payload.email.lower().strip()})
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
-            )
-
         user_doc = {
             "name": payload.name.strip(),
             "email": payload.email.lower().strip(),
@@ -27,8 +30,15 @@ async def register_user(payload: UserCreate, db: AsyncIOMotorDatabase = Depends(
             "password": get_password_hash(payload.password),
             "created_at": datetime.utcnow(),
         }
-        result = await db.users.insert_one(user_doc)
-        user_doc["_id"] = result.inserted_id
+        # One round trip: the unique, case-insensitive email index rejects duplicates,
+        # including concurrent signups that a find-then-insert would let through (the
+        # repository falls back to a lookup while the index is missing)
+        try:
+            await repos.users.insert(user_doc)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+            )
 
         public_user = user_to_public(user_doc)
         token = create_access_token({"sub": object_id_to_str(public_user["id"])})
@@ -43,9 +53,9 @@ async def register_user(payload: UserCreate, db: AsyncIOMotorDatabase = Depends(
 
 
 @router.post("/login", response_model=Token)
-async def login_user(payload: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def login_user(payload: UserLogin, repos: Repositories = Depends(get_repos)):
     try:
-        user = await db.users.find_one({"email": payload.email.lower().strip()})
+        user = await repos.users.find_by_email(payload.email.strip(), USER_LOGIN)
         if not user or not verify_password(payload.password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,3 +86,25 @@ async def get_me(current_user=Depends(get_current_user)):
         ) from exc
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(
+    token: str = Depends(oauth2_scheme),
+    current_user=Depends(get_current_user),
+    repos: Repositories = Depends(get_repos),
+):
+    try:
+        claims = await verify_token(token)
+        # Revoke first, so a worker whose cached copy is dropped next can't re-verify it
+        await repos.users.revoke_token(
+            token_digest(token),
+            to_object_id(current_user["id"]),
+            datetime.utcfromtimestamp(claims["exp"]),
+        )
+        await forget_token(token)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to logout",
+        ) from exc
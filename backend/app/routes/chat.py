@@ -2,33 +2,34 @@ from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ReturnDocument
 
-from ..dependencies import get_current_user, get_db
+from ..config import settings
+from ..dependencies import get_current_user, get_repos
+from ..instrumentation import TimedRoute
+from ..participants import get_participants
+from ..projections import CHAT_PUBLIC
+from ..repositories import Repositories
 from ..schemas import ChatCreate, ChatPublic
-from ..utils import chat_to_public, object_id_to_str, to_object_id
+from ..serialization import list_response
+from ..utils import chat_to_public, to_object_id
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/{order_id}/messages", response_model=ChatPublic, status_code=status.HTTP_201_CREATED)
 async def create_message(
     order_id: str,
     payload: ChatCreate,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
         # Verify order exists and user is participant
-        order = await db.orders.find_one({"_id": oid})
-        if not order:
+        participants = await get_participants(repos, oid, current_user["id"])
+        if not participants:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        requester_id = object_id_to_str(order["requester_id"])
-        fetcher_id = object_id_to_str(order["fetcher_id"]) if order.get("fetcher_id") else None
-
-        if current_user["id"] not in {requester_id, fetcher_id}:
+        if current_user["id"] not in participants.values():
             raise HTTPException(status_code=403, detail="Not a participant in this order")
 
         chat_doc = {
@@ -39,8 +40,7 @@ async def create_message(
             "created_at": datetime.utcnow(),
         }
         
-        result = await db.chats.insert_one(chat_doc)
-        chat_doc["_id"] = result.inserted_id
+        await repos.chats.insert(chat_doc)
         
         return ChatPublic(**chat_to_public(chat_doc))
     except HTTPException:
@@ -55,25 +55,21 @@ async def create_message(
 @router.get("/{order_id}/messages", response_model=List[ChatPublic])
 async def list_messages(
     order_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
         # Verify order exists and user is participant
-        order = await db.orders.find_one({"_id": oid})
-        if not order:
+        participants = await get_participants(repos, oid, current_user["id"])
+        if not participants:
              raise HTTPException(status_code=404, detail="Order not found")
-        
-        requester_id = object_id_to_str(order["requester_id"])
-        fetcher_id = object_id_to_str(order["fetcher_id"]) if order.get("fetcher_id") else None
 
-        if current_user["id"] not in {requester_id, fetcher_id}:
+        if current_user["id"] not in participants.values():
              raise HTTPException(status_code=403, detail="Not a participant in this order")
 
-        cursor = db.chats.find({"order_id": oid}).sort("created_at", 1)
-        chats = await cursor.to_list(length=1000)
-        return [ChatPublic(**chat_to_public(chat)) for chat in chats]
+        chats = await repos.chats.for_order(oid, CHAT_PUBLIC, include_archived=settings.archive_chats)
+        return list_response(ChatPublic, [chat_to_public(chat) for chat in chats])
     except HTTPException:
         raise
     except Exception as exc:
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..consistency import gather
+from ..dependencies import get_current_user, get_repos
+from ..instrumentation import TimedRoute
+from ..projections import OFFER_PUBLIC, ORDER_SUMMARY
+from ..repositories import Repositories
+from ..schemas import FetcherDashboard, OfferPublic, OrderPublic, RequesterDashboard
+from ..serialization import composite_response
+from ..utils import offer_to_public, to_object_id
+from .orders import enrich_orders, open_orders_query
+
+router = APIRouter(route_class=TimedRoute)
+
+# One request per view on first render: authenticate once, run the view's queries
+# concurrently (one causal session each, see consistency.gather), and enrich every
+# order with a single user lookup.
+
+
+@router.get("/requester", response_model=RequesterDashboard)
+async def requester_dashboard(
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    try:
+        user_oid = to_object_id(current_user["id"])
+        orders, offers = await gather(
+            repos.orders.find({"requester_id": user_oid}, ORDER_SUMMARY, limit=100),
+            repos.offers.find({"fetcher_id": {"$ne": user_oid}}, OFFER_PUBLIC, limit=50),
+        )
+        enriched = await enrich_orders(orders, repos, current_user["id"])
+        return composite_response(
+            RequesterDashboard,
+            orders=(OrderPublic, enriched),
+            offers=(OfferPublic, [offer_to_public(offer) for offer in offers]),
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to load dashboard",
+        ) from exc
+
+
+@router.get("/fetcher", response_model=FetcherDashboard)
+async def fetcher_dashboard(
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    try:
+        user_oid = to_object_id(current_user["id"])
+        open_orders, tasks, offers = await gather(
+            repos.orders.find(open_orders_query(user_oid), ORDER_SUMMARY, limit=100),
+            repos.orders.find({"fetcher_id": user_oid}, ORDER_SUMMARY, limit=100),
+            repos.offers.find({"fetcher_id": user_oid}, OFFER_PUBLIC, limit=50),
+        )
+        enriched = await enrich_orders(open_orders + tasks, repos, current_user["id"])
+        return composite_response(
+            FetcherDashboard,
+            open_orders=(OrderPublic, enriched[: len(open_orders)]),
+            my_tasks=(OrderPublic, enriched[len(open_orders):]),
+            offers=(OfferPublic, [offer_to_public(offer) for offer in offers]),
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to load dashboard",
+        ) from exc
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..dependencies import get_stream_user
+from ..events import broker, format_sse
+from ..instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    current_user=Depends(get_stream_user),
+):
+    sub = broker.subscribe(current_user["id"], last_event_id)
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        sub.queue.get(), timeout=settings.sse_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    break
+                yield format_sse(message)
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,19 +2,21 @@ from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ReturnDocument
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import get_current_user, get_repos
+from ..instrumentation import TimedRoute
+from ..projections import OFFER_OWNER, OFFER_PUBLIC
+from ..repositories import Repositories
 from ..schemas import OfferCreate, OfferPublic, OfferUpdate
+from ..serialization import list_response
 from ..utils import offer_to_public, to_object_id, object_id_to_str
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("", response_model=OfferPublic, status_code=status.HTTP_201_CREATED)
 async def create_offer(
     payload: OfferCreate,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
@@ -22,8 +24,7 @@ async def create_offer(
         offer_doc["fetcher_id"] = to_object_id(current_user["id"])
         offer_doc["created_at"] = datetime.utcnow()
         
-        result = await db.offers.insert_one(offer_doc)
-        offer_doc["_id"] = result.inserted_id
+        await repos.offers.insert(offer_doc)
         
         # Reuse order_to_public utility since it just converts _id to id and handles ObjectId
         return OfferPublic(**offer_to_public(offer_doc))
@@ -36,12 +37,12 @@ async def create_offer(
 @router.delete("/{offer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_offer(
     offer_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(offer_id)
-        offer = await db.offers.find_one({"_id": oid})
+        offer = await repos.offers.get(oid, OFFER_OWNER)
         if not offer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Offer not found"
@@ -53,7 +54,7 @@ async def delete_offer(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this offer"
             )
             
-        await db.offers.delete_one({"_id": oid})
+        await repos.offers.delete(oid)
     except HTTPException:
         raise
     except Exception as exc:
@@ -67,12 +68,12 @@ async def delete_offer(
 async def update_offer(
     offer_id: str,
     payload: OfferUpdate,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(offer_id)
-        offer = await db.offers.find_one({"_id": oid})
+        offer = await repos.offers.get(oid, OFFER_PUBLIC)
         if not offer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Offer not found"
@@ -88,11 +89,7 @@ async def update_offer(
         if not update_data:
             return OfferPublic(**offer_to_public(offer))
 
-        updated = await db.offers.find_one_and_update(
-            {"_id": oid},
-            {"$set": update_data},
-            return_document=ReturnDocument.AFTER,
-        )
+        updated = await repos.offers.update(oid, update_data, OFFER_PUBLIC)
         return OfferPublic(**offer_to_public(updated))
     except HTTPException:
         raise
@@ -103,13 +100,12 @@ async def update_offer(
         ) from exc
 @router.get("", response_model=List[OfferPublic])
 async def list_offers(
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
 ):
     try:
         # Fetch recent offers, limited to 50 for now
-        cursor = db.offers.find().sort("created_at", -1).limit(50)
-        offers = await cursor.to_list(length=50)
-        return [OfferPublic(**offer_to_public(offer)) for offer in offers]
+        offers = await repos.offers.find({}, OFFER_PUBLIC, limit=50)
+        return list_response(OfferPublic, [offer_to_public(offer) for offer in offers])
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
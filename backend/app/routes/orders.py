@@ -1,20 +1,58 @@
 from datetime import datetime
 from typing import List, Optional, Any
 
+from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ReturnDocument
 
-from ..dependencies import get_current_user, get_db
-from ..schemas import OrderCreate, OrderPublic, OrderStatusUpdate, PaymentSubmission, PayoutDetailsSubmission, PayoutConfirmation
-from ..utils import object_id_to_str, order_to_public, to_object_id
-
-router = APIRouter()
+from ..cache import bus
+from ..config import settings
+from ..dependencies import get_current_user, get_repos
+from ..events import publish_order_event
+from ..instrumentation import TimedRoute
+from ..jobs import job_queue
+from ..order_log import order_log
+from ..participants import get_participants, participant_cache, remember_participants, update_participants
+from ..projections import (
+    ID_ONLY,
+    ORDER_DETAIL,
+    ORDER_EVENT_PUBLIC,
+    ORDER_PARTICIPANTS,
+    ORDER_SUMMARY,
+    ORDER_TRANSITION,
+    PAYOUT_DETAIL,
+    USER_CONTACT,
+)
+from ..repositories import Repositories
+from ..schemas import (
+    OrderBulkCreate,
+    OrderBulkItemResult,
+    OrderBulkResult,
+    OrderBulkStatusUpdate,
+    OrderCreate,
+    OrderEventPublic,
+    OrderPublic,
+    OrderStatusUpdate,
+    PaymentSubmission,
+    PayoutConfirmation,
+    PayoutDetailsSubmission,
+)
+from ..serialization import list_response
+from ..utils import (
+    legacy_inline_fields,
+    object_id_to_str,
+    order_event_to_public,
+    order_to_public,
+    payout_to_public,
+    to_object_id,
+)
+
+router = APIRouter(route_class=TimedRoute)
 
 VALID_STATUSES = {"open", "accepted", "picked_up", "delivered"}
 
 
-async def enrich_orders(orders: List[dict], db: AsyncIOMotorDatabase, current_user_id: str) -> List[dict]:
+async def enrich_orders(orders: List[dict], repos: Repositories, current_user_id: str) -> List[dict]:
     """
     Populates requester_name, fetcher_name, and conditionally requester_contact, fetcher_contact
     based on the current user's relation to the order and the order status.
@@ -33,8 +71,7 @@ async def enrich_orders(orders: List[dict], db: AsyncIOMotorDatabase, current_us
     # Fetch users
     users = {}
     if user_ids:
-        cursor = db.users.find({"_id": {"$in": list(user_ids)}})
-        async for user in cursor:
+        for user in await repos.users.get_many(user_ids, USER_CONTACT):
             users[str(user["_id"])] = user
 
     enriched = []
@@ -78,28 +115,97 @@ async def enrich_orders(orders: List[dict], db: AsyncIOMotorDatabase, current_us
     return enriched
 
 
+def open_orders_query(user_oid: ObjectId) -> dict:
+    """Open orders a fetcher may pick up: not their own, untargeted or targeted at them."""
+    return {
+        "$and": [
+            {"status": "open"},
+            {"requester_id": {"$ne": user_oid}},
+            {"$or": [
+                {"target_fetcher_id": user_oid},
+                {"target_fetcher_id": None},
+                {"target_fetcher_id": {"$exists": False}}
+            ]}
+        ]
+    }
+
+
+async def load_payout(repos: Repositories, order: dict) -> dict:
+    """
+    Payment/payout details for one order. Fields written since the split live in `payouts`
+    and win; a half-migrated order still has the rest inline on the order itself.
+    """
+    payout = await repos.orders.get_payout(order["_id"], PAYOUT_DETAIL)
+    return payout_to_public({**legacy_inline_fields(order), **(payout or {})})
+
+
+async def save_payout(repos: Repositories, oid: ObjectId, fields: dict) -> dict:
+    payout = await repos.orders.save_payout(oid, fields, PAYOUT_DETAIL)
+    return payout_to_public(payout)
+
+
+async def record_transition(event: str, field: str, before: dict, after: dict, actor_id: str) -> None:
+    await order_log.record(
+        after["_id"], event, to_object_id(actor_id), field, before.get(field), after.get(field)
+    )
+
+
+async def broadcast_participants(order: dict) -> None:
+    """
+    Tell the other workers an order's participants changed, from the job queue. The
+    bus write is a Mongo insert the response doesn't need, and a worker still holding
+    the old entry re-checks Mongo before refusing anyone (see get_participants).
+    """
+    if not bus.running:
+        return
+    keys = [str(order["_id"])]
+    queued = await job_queue.enqueue(
+        "broadcast_invalidations", namespace=participant_cache.namespace, keys=keys, origin=bus.origin
+    )
+    if not queued:
+        await bus.publish(participant_cache.namespace, keys)
+
+
+def new_order_doc(payload: OrderCreate, requester_id: str) -> dict:
+    return {
+        "item": payload.item.strip(),
+        "dropoff_location": payload.dropoff_location.strip(),
+        "instructions": payload.instructions.strip() if payload.instructions else None,
+        "requester_id": to_object_id(requester_id),
+        "fetcher_id": None,
+        "target_offer_id": to_object_id(payload.target_offer_id) if payload.target_offer_id else None,
+        "target_fetcher_id": to_object_id(payload.target_fetcher_id) if payload.target_fetcher_id else None,
+        "status": "open",
+        "created_at": datetime.utcnow(),
+    }
+
+
+def check_bulk_size(count: int) -> None:
+    if count > settings.order_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.order_bulk_max_items} items per request",
+        )
+
+
+def bulk_result(results: List[OrderBulkItemResult]) -> OrderBulkResult:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(result.status_code < 400 for result in results)
+    return OrderBulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
 @router.post("", response_model=OrderPublic, status_code=status.HTTP_201_CREATED)
 async def create_order(
     payload: OrderCreate,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
-        order_doc = {
-            "item": payload.item.strip(),
-            "dropoff_location": payload.dropoff_location.strip(),
-            "instructions": payload.instructions.strip() if payload.instructions else None,
-            "requester_id": to_object_id(current_user["id"]),
-            "fetcher_id": None,
-            "target_offer_id": to_object_id(payload.target_offer_id) if payload.target_offer_id else None,
-            "target_fetcher_id": to_object_id(payload.target_fetcher_id) if payload.target_fetcher_id else None,
-            "status": "open",
-            "created_at": datetime.utcnow(),
-        }
-        result = await db.orders.insert_one(order_doc)
-        order_doc["_id"] = result.inserted_id
+        order_doc = new_order_doc(payload, current_user["id"])
+        await repos.orders.insert(order_doc)
+        await remember_participants(order_doc)
         
-        enriched = await enrich_orders([order_doc], db, current_user["id"])
+        enriched = await enrich_orders([order_doc], repos, current_user["id"])
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -110,11 +216,130 @@ async def create_order(
         ) from exc
 
 
+@router.post("/bulk", response_model=OrderBulkResult)
+async def create_orders_bulk(
+    payload: OrderBulkCreate,
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    """Create up to ORDER_BULK_MAX_ITEMS orders in one write; results are reported per item."""
+    check_bulk_size(len(payload.orders))
+    try:
+        results: List[OrderBulkItemResult] = []
+        docs, indexes = [], []
+        for index, item in enumerate(payload.orders):
+            try:
+                docs.append(new_order_doc(item, current_user["id"]))
+                indexes.append(index)
+            except InvalidId:
+                results.append(
+                    OrderBulkItemResult(
+                        index=index, status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid target id"
+                    )
+                )
+
+        if docs:
+            await repos.orders.insert_many(docs)
+            for doc in docs:
+                await remember_participants(doc)
+            enriched = await enrich_orders(docs, repos, current_user["id"])
+            for index, order in zip(indexes, enriched):
+                results.append(
+                    OrderBulkItemResult(
+                        index=index, status_code=status.HTTP_201_CREATED, order_id=order["id"], order=order
+                    )
+                )
+        return bulk_result(results)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to create orders",
+        ) from exc
+
+
+@router.patch("/bulk/status", response_model=OrderBulkResult)
+async def update_status_bulk(
+    payload: OrderBulkStatusUpdate,
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    """
+    `update_status` for up to ORDER_BULK_MAX_ITEMS orders, with the same permission rules
+    per order. Each write is guarded on the status it was checked against, so an order
+    changed by someone else in the meantime is reported as 409 instead of overwritten.
+    """
+    check_bulk_size(len(payload.items))
+    try:
+        results: List[OrderBulkItemResult] = []
+
+        def fail(index: int, code: int, detail: str, order_id: Optional[str] = None) -> None:
+            results.append(OrderBulkItemResult(index=index, status_code=code, order_id=order_id, detail=detail))
+
+        wanted = {}
+        for index, item in enumerate(payload.items):
+            if not ObjectId.is_valid(item.order_id):
+                fail(index, status.HTTP_400_BAD_REQUEST, "Invalid order id", item.order_id)
+            elif ObjectId(item.order_id) in wanted:
+                fail(index, status.HTTP_400_BAD_REQUEST, "Order listed more than once", item.order_id)
+            else:
+                wanted[ObjectId(item.order_id)] = (index, item)
+
+        current = {}
+        if wanted:
+            orders = await repos.orders.find({"_id": {"$in": list(wanted)}}, ORDER_TRANSITION, limit=len(wanted))
+            current = {order["_id"]: order for order in orders}
+        pending = []
+        for oid, (index, item) in wanted.items():
+            order = current.get(oid)
+            if order is None:
+                fail(index, status.HTTP_404_NOT_FOUND, "Order not found", item.order_id)
+                continue
+            fetcher_id = object_id_to_str(order["fetcher_id"]) if order.get("fetcher_id") else None
+            is_requester_confirming = current_user["id"] == str(order["requester_id"]) and item.status == "delivered"
+            if current_user["id"] != fetcher_id and not is_requester_confirming:
+                fail(
+                    index,
+                    status.HTTP_403_FORBIDDEN,
+                    "Only the assigned fetcher can update the status (or requester can confirm delivery)",
+                    item.order_id,
+                )
+                continue
+            pending.append((oid, {"status": item.status}, {"status": order["status"]}))
+
+        updated = await repos.orders.transition_many(pending, ORDER_SUMMARY) if pending else {}
+        enriched = {}
+        if updated:
+            for order in await enrich_orders(list(updated.values()), repos, current_user["id"]):
+                enriched[order["id"]] = order
+        for oid, _, guard in pending:
+            index, item = wanted[oid]
+            if oid not in updated:
+                fail(index, status.HTTP_409_CONFLICT, "Order changed while updating; retry", item.order_id)
+                continue
+            order = enriched[item.order_id]
+            await record_transition("order.status_changed", "status", guard, updated[oid], current_user["id"])
+            publish_order_event("order.status_changed", order)
+            results.append(
+                OrderBulkItemResult(index=index, status_code=status.HTTP_200_OK, order_id=item.order_id, order=order)
+            )
+        return bulk_result(results)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to update order statuses",
+        ) from exc
+
+
 @router.get("", response_model=List[OrderPublic])
 async def list_orders(
     status_filter: Optional[str] = None,
     target_offer_id: Optional[str] = None,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    include_archived: bool = False,
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
@@ -136,17 +361,7 @@ async def list_orders(
                 # 3. Targeted Visibility: 
                 #    (Target == Current User) OR (Target is None/Missing)
                 
-                query = {
-                    "$and": [
-                        {"status": "open"},
-                        {"requester_id": {"$ne": current_uid_obj}},
-                        {"$or": [
-                            {"target_fetcher_id": current_uid_obj},
-                            {"target_fetcher_id": None},
-                            {"target_fetcher_id": {"$exists": False}}
-                        ]}
-                    ]
-                }
+                query = open_orders_query(current_uid_obj)
             else:
                 # For other statuses (e.g. accepted), we generally filter by participant in enrich_orders
                 # or here if needed. For now, basic status filter.
@@ -155,11 +370,16 @@ async def list_orders(
         if target_offer_id:
             query["target_offer_id"] = to_object_id(target_offer_id)
 
-        orders_cursor = db.orders.find(query).sort("created_at", -1)
-        orders = await orders_cursor.to_list(length=100)
+        # Only delivered orders are ever archived, so other status filters stay hot-only
+        orders = await repos.orders.find(
+            query,
+            ORDER_SUMMARY,
+            limit=100,
+            include_archived=include_archived and status_filter in {None, "delivered"},
+        )
         
-        enriched = await enrich_orders(orders, db, current_user["id"])
-        return [OrderPublic(**o) for o in enriched]
+        enriched = await enrich_orders(orders, repos, current_user["id"])
+        return list_response(OrderPublic, enriched)
     except HTTPException:
         raise
     except Exception as exc:
@@ -169,26 +389,64 @@ async def list_orders(
         ) from exc
 
 
+@router.get("/{order_id}", response_model=OrderPublic)
+async def get_order(
+    order_id: str,
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    try:
+        order = await repos.orders.get(to_object_id(order_id), ORDER_DETAIL, include_archived=True)
+        if not order:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+
+        # Payment and bank details are only shown to the two participants
+        fetcher_id = object_id_to_str(order["fetcher_id"]) if order.get("fetcher_id") else None
+        if current_user["id"] not in {object_id_to_str(order["requester_id"]), fetcher_id}:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Not a participant in this order"
+            )
+
+        enriched = await enrich_orders([order], repos, current_user["id"])
+        enriched[0].update(await load_payout(repos, order))
+        return OrderPublic(**enriched[0])
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to fetch order",
+        ) from exc
+
+
 @router.post("/{order_id}/accept", response_model=OrderPublic)
 async def accept_order(
     order_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
-        update_result = await db.orders.find_one_and_update(
-            {"_id": oid, "status": "open"},
-            {"$set": {"status": "accepted", "fetcher_id": to_object_id(current_user["id"])}},
-            return_document=ReturnDocument.AFTER,
+        transition = await repos.orders.transition(
+            oid,
+            {"status": "accepted", "fetcher_id": to_object_id(current_user["id"])},
+            ORDER_SUMMARY,
+            guard={"status": "open"},
         )
-        if not update_result:
+        if not transition:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order not available for acceptance",
             )
+        before, update_result = transition
+        await update_participants(update_result, broadcast=False)
+        await record_transition("order.accepted", "status", before, update_result, current_user["id"])
         
-        enriched = await enrich_orders([update_result], db, current_user["id"])
+        enriched = await enrich_orders([update_result], repos, current_user["id"])
+        publish_order_event("order.accepted", enriched[0])
+        await broadcast_participants(update_result)
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -203,7 +461,7 @@ async def accept_order(
 async def update_status(
     order_id: str,
     payload: OrderStatusUpdate,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
@@ -213,7 +471,7 @@ async def update_status(
             )
 
         oid = to_object_id(order_id)
-        order = await db.orders.find_one({"_id": oid})
+        order = await repos.orders.get(oid, ORDER_PARTICIPANTS)
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -237,13 +495,17 @@ async def update_status(
                     detail="Only the assigned fetcher can update the status (or requester can confirm delivery)",
                 )
 
-        updated = await db.orders.find_one_and_update(
-            {"_id": oid},
-            {"$set": {"status": payload.status}},
-            return_document=ReturnDocument.AFTER,
-        )
+        transition = await repos.orders.transition(oid, {"status": payload.status}, ORDER_SUMMARY)
+        if not transition:
+            # Archived or deleted since it was read above
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+        before, updated = transition
+        await record_transition("order.status_changed", "status", before, updated, current_user["id"])
         
-        enriched = await enrich_orders([updated], db, current_user["id"])
+        enriched = await enrich_orders([updated], repos, current_user["id"])
+        publish_order_event("order.status_changed", enriched[0])
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -258,12 +520,12 @@ async def update_status(
 async def submit_payment(
     order_id: str,
     payload: PaymentSubmission,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
-        order = await db.orders.find_one({"_id": oid})
+        order = await repos.orders.get(oid, ORDER_PARTICIPANTS)
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -276,17 +538,21 @@ async def submit_payment(
                 detail="Only the requester can submit payment",
             )
 
-        updated = await db.orders.find_one_and_update(
-            {"_id": oid},
-            {"$set": {
-                "payment_sent": True,
-                "txn_id": payload.txn_id,
-                "paid_to_platform": True # Assuming trust for now, or this flags 'review needed'
-            }},
-            return_document=ReturnDocument.AFTER,
-        )
+        payout = await save_payout(repos, oid, {
+            "txn_id": payload.txn_id,
+            "paid_to_platform": True # Assuming trust for now, or this flags 'review needed'
+        })
+        transition = await repos.orders.transition(oid, {"payment_sent": True}, ORDER_SUMMARY)
+        if not transition:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+        before, updated = transition
+        await record_transition("order.payment_submitted", "payment_sent", before, updated, current_user["id"])
         
-        enriched = await enrich_orders([updated], db, current_user["id"])
+        enriched = await enrich_orders([updated], repos, current_user["id"])
+        enriched[0].update(payout)
+        publish_order_event("order.payment_submitted", enriched[0])
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -301,12 +567,12 @@ async def submit_payment(
 async def submit_payout_details(
     order_id: str,
     payload: PayoutDetailsSubmission,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
-        order = await db.orders.find_one({"_id": oid})
+        order = await repos.orders.get(oid, ORDER_PARTICIPANTS)
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -320,18 +586,24 @@ async def submit_payout_details(
                 detail="Only the assigned fetcher can submit payout details",
             )
 
-        updated = await db.orders.find_one_and_update(
-            {"_id": oid},
-            {"$set": {
-                "fetcher_bank_name": payload.bank_name,
-                "fetcher_account_number": payload.account_number,
-                "fetcher_account_title": payload.account_title,
-                "payout_status": "PENDING"
-            }},
-            return_document=ReturnDocument.AFTER,
+        payout = await save_payout(repos, oid, {
+            "fetcher_bank_name": payload.bank_name,
+            "fetcher_account_number": payload.account_number,
+            "fetcher_account_title": payload.account_title,
+        })
+        transition = await repos.orders.transition(oid, {"payout_status": "PENDING"}, ORDER_SUMMARY)
+        if not transition:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+        before, updated = transition
+        await record_transition(
+            "order.payout_details_submitted", "payout_status", before, updated, current_user["id"]
         )
         
-        enriched = await enrich_orders([updated], db, current_user["id"])
+        enriched = await enrich_orders([updated], repos, current_user["id"])
+        enriched[0].update(payout)
+        publish_order_event("order.payout_details_submitted", enriched[0])
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -347,12 +619,12 @@ async def submit_payout_details(
 async def confirm_payout(
     order_id: str,
     payload: PayoutConfirmation,
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    repos: Repositories = Depends(get_repos),
     current_user=Depends(get_current_user),
 ):
     try:
         oid = to_object_id(order_id)
-        order = await db.orders.find_one({"_id": oid})
+        order = await repos.orders.get(oid, ID_ONLY)
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -363,17 +635,21 @@ async def confirm_payout(
         fetcher_share = total * 0.75
         platform_share = total * 0.25
 
-        updated = await db.orders.find_one_and_update(
-            {"_id": oid},
-            {"$set": {
-                "payout_status": "PAID",
-                "platform_fee": platform_share,
-                "fetcher_paid_amount": fetcher_share
-            }},
-            return_document=ReturnDocument.AFTER,
-        )
+        payout = await save_payout(repos, oid, {
+            "platform_fee": platform_share,
+            "fetcher_paid_amount": fetcher_share
+        })
+        transition = await repos.orders.transition(oid, {"payout_status": "PAID"}, ORDER_SUMMARY)
+        if not transition:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+        before, updated = transition
+        await record_transition("order.payout_confirmed", "payout_status", before, updated, current_user["id"])
         
-        enriched = await enrich_orders([updated], db, current_user["id"])
+        enriched = await enrich_orders([updated], repos, current_user["id"])
+        enriched[0].update(payout)
+        publish_order_event("order.payout_confirmed", enriched[0])
         return OrderPublic(**enriched[0])
     except HTTPException:
         raise
@@ -382,3 +658,37 @@ async def confirm_payout(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Unable to confirm payout",
         ) from exc
+
+
+@router.get("/{order_id}/timeline", response_model=List[OrderEventPublic])
+async def get_timeline(
+    order_id: str,
+    repos: Repositories = Depends(get_repos),
+    current_user=Depends(get_current_user),
+):
+    try:
+        oid = to_object_id(order_id)
+        participants = await get_participants(repos, oid)
+        if not participants:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
+        if current_user["id"] not in participants.values():
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Not a participant in this order"
+            )
+
+        events = await repos.orders.timeline(oid, ORDER_EVENT_PUBLIC)
+        # Changes made through this worker that the log hasn't written yet
+        written = {event["_id"] for event in events}
+        buffered = [event for event in order_log.pending_for(oid) if event["_id"] not in written]
+        if buffered:
+            events = sorted(events + buffered, key=lambda event: (event["at"], event["_id"]))
+        return list_response(OrderEventPublic, [order_event_to_public(event) for event in events])
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to fetch order timeline",
+        ) from exc
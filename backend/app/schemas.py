@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
@@ -72,6 +72,8 @@ class OrderPublic(OrderBase):
     created_at: datetime
     
     # NEW: Include payment fields in public view
+    # Listings only carry payment_sent/payout_status; the rest is filled by
+    # GET /orders/{id} and the payment/payout endpoints
     payment_sent: bool = False
     txn_id: Optional[str] = None
     paid_to_platform: bool = False
@@ -119,6 +121,17 @@ class OfferPublic(OfferBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RequesterDashboard(BaseModel):
+    orders: List[OrderPublic]
+    offers: List[OfferPublic]  # other fetchers' offers
+
+
+class FetcherDashboard(BaseModel):
+    open_orders: List[OrderPublic]
+    my_tasks: List[OrderPublic]
+    offers: List[OfferPublic]  # the fetcher's own offers
+
+
 class ChatCreate(BaseModel):
     content: str = Field(..., max_length=1000)
 
@@ -133,6 +146,43 @@ class ChatPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrderBulkCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1)
+
+
+class OrderBulkStatusItem(OrderStatusUpdate):
+    order_id: str
+
+
+class OrderBulkStatusUpdate(BaseModel):
+    items: List[OrderBulkStatusItem] = Field(..., min_length=1)
+
+
+class OrderBulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    order_id: Optional[str] = None
+    order: Optional[OrderPublic] = None
+    detail: Optional[str] = None
+
+
+class OrderBulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[OrderBulkItemResult]
+
+
+class OrderEventPublic(BaseModel):
+    id: str
+    order_id: str
+    event: str
+    actor_id: Optional[str] = None
+    field: str
+    from_value: Any = None
+    to_value: Any = None
+    at: datetime
+
+
 class PaymentSubmission(BaseModel):
     txn_id: str = Field(..., max_length=100)
     
@@ -146,3 +196,16 @@ class PayoutConfirmation(BaseModel):
     total_amount: float = Field(..., gt=0)
 
 
+class ProfileStart(BaseModel):
+    mode: str = Field("cprofile", pattern="^(cprofile|sample)$")
+    route: Optional[str] = Field(None, max_length=200)  # e.g. "GET /orders" or "/chat"
+    requests: Optional[int] = Field(None, gt=0)
+    seconds: float = Field(30, gt=0)
+    interval_ms: float = Field(5, gt=0)
+
+
+class ArchiveRun(BaseModel):
+    # Unset fields fall back to the ARCHIVE_* settings
+    min_age_days: Optional[float] = Field(None, ge=0)
+    batch_size: Optional[int] = Field(None, gt=0, le=5000)
+    max_batches: Optional[int] = Field(None, gt=0)
@@ -1,10 +1,16 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from passlib.context import CryptContext
+from pymongo import ASCENDING
 
+from .cache import MISSING, bus, get_cache
 from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -22,18 +28,78 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[int] = Non
     expire_minutes = expires_delta or settings.access_token_expire_minutes
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
-    to_encode.update({"exp": expire})
+    # jti keeps tokens issued in the same second distinct, so revoking one doesn't revoke both
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def decode_token(token: str) -> Dict[str, Any]:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         return payload
     except JWTError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from exc
+        raise _credentials_exception() from exc
+
+
+# sha256(token) -> decoded claims, until the token's own exp. Always per process: the
+# claims are cheap to recompute, and a shared copy would cost the round trip it saves.
+token_cache = get_cache(
+    "verified_tokens",
+    ttl=settings.access_token_expire_minutes * 60,
+    max_entries=settings.token_cache_size,
+    shared=False,
+)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def verify_token(
+    token: str, is_revoked: Optional[Callable[[str], Awaitable[bool]]] = None
+) -> Dict[str, Any]:
+    """
+    `decode_token` behind `token_cache`. `is_revoked(digest)` (the revocation list) is
+    only consulted when the signature is actually verified; `forget_token` evicts a
+    revoked token from every worker's cache, so later requests take that path again.
+
+    A revocation that lands between the check and caching the claims evicts nothing
+    yet, so the claims are only stored if the token wasn't forgotten meanwhile. When
+    the invalidation bus isn't running, other workers never hear of a logout, and
+    entries are kept for at most TOKEN_CACHE_UNSYNCED_TTL_SECONDS.
+    """
+    digest = token_digest(token)
+    if settings.token_cache_enabled:
+        claims = await token_cache.get(digest)
+        if claims is not MISSING:
+            return claims
+
+    since = token_cache.snapshot()
+    claims = decode_token(token)
+    if is_revoked is not None and await is_revoked(digest):
+        raise _credentials_exception()
+
+    ttl = claims.get("exp", 0) - time.time()
+    if not bus.running:
+        ttl = min(ttl, settings.token_cache_unsynced_ttl_seconds)
+    if settings.token_cache_enabled and ttl > 0:
+        await token_cache.set(digest, claims, ttl=ttl, since=since)
+    return claims
+
+
+async def forget_token(token: str) -> None:
+    await token_cache.invalidate(token_digest(token))
+
+
+async def start_token_revocation(db: AsyncIOMotorDatabase) -> None:
+    # Revoked tokens only need remembering until they'd have expired anyway
+    await db.revoked_tokens.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
 
@@ -0,0 +1,73 @@
+"""
+Fast path for list responses.
+
+Returning `[OrderPublic(**o) for o in rows]` validates every row twice: once building
+the models and again when FastAPI checks the result against `response_model`. The rows
+come from our own converters (`utils.*_to_public`), so they are trusted: `public_rows`
+lays each one out in the model's field order with the model's defaults, dropping
+anything the model doesn't expose, and the result is encoded once with orjson into a raw
+response. Routes keep their `response_model` so the OpenAPI schema is unchanged.
+
+FAST_JSON_ENABLED=false restores the validating path (scripts/bench_serialization.py
+compares the two).
+"""
+
+from typing import Any, Dict, FrozenSet, List, Tuple, Type
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from .config import settings
+
+Layout = Tuple[FrozenSet[str], Tuple[Tuple[str, Any], ...]]
+
+_layouts: Dict[Type[BaseModel], Layout] = {}
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # Naive datetimes come out as ISO 8601 without an offset, as Pydantic writes them
+        return orjson.dumps(content)
+
+
+def _layout(model: Type[BaseModel]) -> Layout:
+    layout = _layouts.get(model)
+    if layout is None:
+        defaults = tuple(
+            (name, None if field.is_required() else field.get_default(call_default_factory=True))
+            for name, field in model.model_fields.items()
+        )
+        layout = _layouts[model] = (frozenset(model.model_fields), defaults)
+    return layout
+
+
+def public_rows(model: Type[BaseModel], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """`model(**row).model_dump()` for each row, without validating it."""
+    names, defaults = _layout(model)
+    # Rows that already have exactly the model's fields (e.g. chat_to_public's) go out as they are
+    return [
+        row if row.keys() == names else {name: row.get(name, default) for name, default in defaults}
+        for row in rows
+    ]
+
+
+def list_response(model: Type[BaseModel], rows: List[Dict[str, Any]]) -> Any:
+    """Endpoint return value for a `List[model]` response built from converter output."""
+    if not settings.fast_json_enabled:
+        return [model(**row) for row in rows]
+    return FastJSONResponse(public_rows(model, rows))
+
+
+def composite_response(
+    model: Type[BaseModel], **parts: Tuple[Type[BaseModel], List[Dict[str, Any]]]
+) -> Any:
+    """
+    Like `list_response` for a model made of lists, e.g.
+    `composite_response(RequesterDashboard, orders=(OrderPublic, rows), offers=(OfferPublic, rows))`.
+    """
+    if not settings.fast_json_enabled:
+        return model(**{name: [item(**row) for row in rows] for name, (item, rows) in parts.items()})
+    return FastJSONResponse({name: public_rows(item, rows) for name, (item, rows) in parts.items()})
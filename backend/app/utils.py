@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 
@@ -12,6 +12,30 @@ def object_id_to_str(value: Any) -> str:
     return str(value) if isinstance(value, ObjectId) else str(ObjectId(value))
 
 
+RouteMap = List[Tuple[Optional[str], str, str]]
+
+
+def parse_route_map(raw: str) -> RouteMap:
+    """"GET /orders=2000,/admin=30000" -> [(method, path_prefix, value)], most specific first."""
+    routes = []
+    for item in raw.split(","):
+        route, sep, value = item.partition("=")
+        if not sep or not route.strip():
+            continue
+        method, _, path = route.strip().partition(" ")
+        if not path:
+            method, path = None, method
+        routes.append((method.upper() if method else None, path, value.strip()))
+    return sorted(routes, key=lambda r: (len(r[1]), r[0] is not None), reverse=True)
+
+
+def match_route(routes: RouteMap, method: str, path: str) -> Optional[str]:
+    for route_method, prefix, value in routes:
+        if path.startswith(prefix) and route_method in (None, method):
+            return value
+    return None
+
+
 def user_to_public(user: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "id": object_id_to_str(user.get("_id")),
@@ -31,20 +55,35 @@ def order_to_public(order: Dict[str, Any]) -> Dict[str, Any]:
         "target_offer_id": object_id_to_str(order.get("target_offer_id")) if order.get("target_offer_id") else None,
         "status": order.get("status"),
         "created_at": order.get("created_at"),
-        
+        # Summary flags stay on the order; the details live in `payouts`
         "payment_sent": order.get("payment_sent", False),
-        "txn_id": order.get("txn_id"),
-        "paid_to_platform": order.get("paid_to_platform", False),
-        
-        "fetcher_bank_name": order.get("fetcher_bank_name"),
-        "fetcher_account_number": order.get("fetcher_account_number"),
-        "fetcher_account_title": order.get("fetcher_account_title"),
         "payout_status": order.get("payout_status"),
-        "platform_fee": order.get("platform_fee"),
-        "fetcher_paid_amount": order.get("fetcher_paid_amount"),
     }
 
 
+# Payment and payout details, stored in the `payouts` collection keyed by order _id
+PAYOUT_FIELDS = (
+    "txn_id",
+    "paid_to_platform",
+    "fetcher_bank_name",
+    "fetcher_account_number",
+    "fetcher_account_title",
+    "platform_fee",
+    "fetcher_paid_amount",
+)
+
+
+def legacy_inline_fields(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Payout fields still stored on an order that scripts/migrate_payouts.py hasn't moved yet."""
+    return {field: order[field] for field in PAYOUT_FIELDS if order.get(field) is not None}
+
+
+def payout_to_public(payout: Dict[str, Any]) -> Dict[str, Any]:
+    public = {field: payout.get(field) for field in PAYOUT_FIELDS}
+    public["paid_to_platform"] = payout.get("paid_to_platform", False)
+    return public
+
+
 def offer_to_public(offer: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "id": object_id_to_str(offer.get("_id")),
@@ -61,6 +100,19 @@ def offer_to_public(offer: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def order_event_to_public(event: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": object_id_to_str(event.get("_id")),
+        "order_id": object_id_to_str(event.get("order_id")),
+        "event": event.get("event"),
+        "actor_id": object_id_to_str(event["actor_id"]) if event.get("actor_id") else None,
+        "field": event.get("field"),
+        "from_value": event.get("from_value"),
+        "to_value": event.get("to_value"),
+        "at": event.get("at"),
+    }
+
+
 def chat_to_public(chat: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "id": object_id_to_str(chat.get("_id")),
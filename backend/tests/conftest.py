@@ -0,0 +1,5 @@
+import os
+
+# Settings are read at import time, so configure before anything imports the app
+os.environ["STORAGE_ENGINE"] = "memory"
+os.environ["SERVER_TIMING_ENABLED"] = "false"
@@ -0,0 +1,73 @@
+"""
+Duplicate signups on the in-memory engine: concurrent registrations of one address in
+different letter case must create exactly one account, with or without the unique
+email index (scripts/check_signup_race.py runs the same race against a real mongod).
+"""
+
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import httpx
+
+from backend.app.dependencies import get_repos
+from backend.app.main import app
+from backend.app.repositories import MemoryStore, Repositories
+from scripts.check_signup_race import spellings
+
+SIGNUPS = 20
+
+
+async def race(repos: Repositories, email: str):
+    app.dependency_overrides[get_repos] = lambda: repos
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/auth/register",
+                        json={
+                            "name": "Racer",
+                            "email": spelling,
+                            "password": "secret123",
+                            "phone_number": "03001234567",
+                        },
+                    )
+                    for spelling in spellings(email, SIGNUPS)
+                )
+            )
+            login = await client.post("/auth/login", json={"email": email.upper(), "password": "secret123"})
+    finally:
+        app.dependency_overrides.pop(get_repos, None)
+    return Counter(response.status_code for response in responses), login.status_code
+
+
+def test_concurrent_signups_create_one_account():
+    repos = Repositories(MemoryStore())
+    asyncio.run(repos.ensure_indexes())
+    assert repos.users.email_index_ready
+
+    email = f"race-{uuid.uuid4().hex[:8]}@example.com"
+    statuses, login = asyncio.run(race(repos, email))
+
+    assert statuses == {201: 1, 400: SIGNUPS - 1}
+    assert login == 200
+
+
+def test_duplicates_rejected_while_unique_index_is_missing():
+    repos = Repositories(MemoryStore())
+    # Legacy accounts differing only in case keep the index from being built
+    for email in ("legacy@example.com", "Legacy@example.com"):
+        asyncio.run(repos.users.users.insert_one({"name": "Legacy", "email": email, "created_at": datetime.utcnow()}))
+    asyncio.run(repos.ensure_indexes())
+    assert not repos.users.email_index_ready
+
+    email = f"race-{uuid.uuid4().hex[:8]}@example.com"
+    statuses, login = asyncio.run(race(repos, email))
+
+    assert statuses == {201: 1, 400: SIGNUPS - 1}
+    assert login == 200
+    legacy, _ = asyncio.run(race(repos, "LEGACY@example.com"))
+    assert legacy == {400: SIGNUPS}
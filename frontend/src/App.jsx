@@ -3,6 +3,7 @@ import axios from "axios";
 import clsx from "clsx";
 import { Routes, Route, Navigate } from "react-router-dom";
 
+import { withCausalToken } from "./causalToken";
 import Layout from "./components/Layout";
 import Dashboard from "./pages/Dashboard";
 import RequesterView from "./pages/RequesterView";
@@ -168,15 +169,17 @@ export default function App() {
 
   const client = useMemo(
     () =>
-      axios.create({
-        baseURL: API_BASE,
-        headers: token
-          ? {
-            Authorization: `Bearer ${token}`,
-            "Content-Type": "application/json",
-          }
-          : { "Content-Type": "application/json" },
-      }),
+      withCausalToken(
+        axios.create({
+          baseURL: API_BASE,
+          headers: token
+            ? {
+              Authorization: `Bearer ${token}`,
+              "Content-Type": "application/json",
+            }
+            : { "Content-Type": "application/json" },
+        })
+      ),
     [token]
   );
 
@@ -196,7 +199,7 @@ export default function App() {
         authMode === "register"
           ? authForm
           : { email: authForm.email, password: authForm.password };
-      const { data } = await axios.post(`${API_BASE}${endpoint}`, payload, {
+      const { data } = await withCausalToken(axios.create()).post(`${API_BASE}${endpoint}`, payload, {
         headers: { "Content-Type": "application/json" },
       });
       setToken(data.access_token);
@@ -234,7 +237,7 @@ export default function App() {
 
   return (
     <>
-      <Layout user={user} setUser={setUser} setToken={setToken}>
+      <Layout user={user} setUser={setUser} setToken={setToken} client={client}>
         <Routes>
           <Route path="/" element={<Dashboard />} />
           <Route path="/requester" element={<RequesterView client={client} user={user} setMessage={setMessage} />} />
@@ -0,0 +1,20 @@
+const HEADER = "X-Causal-Token";
+let latest = sessionStorage.getItem(HEADER);
+
+// Sends the latest X-Causal-Token the API returned with every request, so reads that
+// the backend routes to a replica set secondary still include this tab's own writes.
+export function withCausalToken(instance) {
+    instance.interceptors.request.use((config) => {
+        if (latest) config.headers[HEADER] = latest;
+        return config;
+    });
+    instance.interceptors.response.use((response) => {
+        const token = response.headers[HEADER.toLowerCase()];
+        if (token) {
+            latest = token;
+            sessionStorage.setItem(HEADER, token);
+        }
+        return response;
+    });
+    return instance;
+}
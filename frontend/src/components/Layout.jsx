@@ -1,9 +1,11 @@
 import { Link, useNavigate } from "react-router-dom";
 
-export default function Layout({ children, user, setUser, setToken }) {
+export default function Layout({ children, user, setUser, setToken, client }) {
     const navigate = useNavigate();
 
     const handleLogout = () => {
+        // Revoke the token server-side; the local session ends either way
+        client?.post("/auth/logout").catch(() => {});
         setUser(null);
         setToken("");
         navigate("/");
@@ -0,0 +1,24 @@
+const ORDER_EVENTS = [
+    "order.accepted",
+    "order.status_changed",
+    "order.payment_submitted",
+    "order.payout_details_submitted",
+    "order.payout_confirmed",
+];
+
+// Opens the /events SSE stream and calls onEvent for every order lifecycle event.
+// EventSource can't send headers, so the token goes in the query string.
+// Returns a cleanup function for useEffect.
+export function subscribeToOrderEvents(client, onEvent) {
+    const auth = client.defaults.headers.Authorization || "";
+    const token = auth.replace("Bearer ", "");
+    if (!token || typeof EventSource === "undefined") return () => {};
+
+    const source = new EventSource(
+        `${client.defaults.baseURL}/events?access_token=${encodeURIComponent(token)}`
+    );
+    ORDER_EVENTS.forEach((name) =>
+        source.addEventListener(name, (e) => onEvent(name, JSON.parse(e.data)))
+    );
+    return () => source.close();
+}
@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import clsx from "clsx";
 import OfferForm from "../components/OfferForm";
 import ChatBox from "../components/ChatBox";
+import { subscribeToOrderEvents } from "../orderEvents";
 
 function StatusPill({ status }) {
     const colors = {
@@ -41,31 +42,28 @@ export default function FetcherView({ client, user, setMessage }) {
         }
     }
 
+    // Open orders I can take, my tasks and my offers in one request
     const fetchOrders = async () => {
         try {
-            const openRes = await client.get("/orders", { params: { status_filter: "open" } });
-            const allRes = await client.get("/orders"); // To get assigned tasks
-
-            // Combine and Dedup: Open orders OR orders assigned to me
-            // Filter out my own requests (failsafe)
-            const relevant = allRes.data.filter(o =>
-                (o.status === "open" && o.requester_id !== user.id) ||
-                o.fetcher_id === user.id
-            );
+            const { data } = await client.get("/dashboard/fetcher");
 
             // Remove duplicates if any (simple ID check)
+            const relevant = [...data.open_orders, ...data.my_tasks];
             const unique = [...new Map(relevant.map(item => [item.id, item])).values()];
             setOrders(unique);
+            setMyOffers(data.offers);
         } catch (err) {
             setMessage("Unable to fetch orders", "error");
         }
     };
 
     useEffect(() => {
-        fetchMyOffers();
         fetchOrders();
     }, []);
 
+    // Live updates instead of waiting for Refresh
+    useEffect(() => subscribeToOrderEvents(client, () => fetchOrders()), [client]);
+
     const handleAccept = async (id) => {
         setLoading(true);
         try {
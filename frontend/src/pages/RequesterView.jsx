@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import clsx from "clsx";
 import ChatBox from "../components/ChatBox";
+import { subscribeToOrderEvents } from "../orderEvents";
 
 function Card({ children, className }) {
     return (
@@ -41,31 +42,25 @@ export default function RequesterView({ client, user, setMessage }) {
     });
     const [selectedOffer, setSelectedOffer] = useState(null);
 
+    // My orders and other fetchers' offers in one request
     const fetchMyOrders = async () => {
         try {
-            const { data } = await client.get("/orders");
-            const myOrders = data.filter(o => o.requester_id === user.id);
-            setOrders(myOrders);
+            const { data } = await client.get("/dashboard/requester");
+            setOrders(data.orders);
+            setOffers(data.offers);
         } catch (err) {
             console.error(err);
             setMessage("Unable to fetch orders", "error");
         }
     };
 
-    const fetchActiveOffers = async () => {
-        try {
-            const { data } = await client.get("/offers");
-            setOffers(data.filter(o => o.fetcher_id !== user.id));
-        } catch (err) {
-            console.error("Unable to list offers");
-        }
-    }
-
     useEffect(() => {
         fetchMyOrders();
-        fetchActiveOffers();
     }, []);
 
+    // Live updates instead of waiting for Refresh
+    useEffect(() => subscribeToOrderEvents(client, () => fetchMyOrders()), [client]);
+
     const handleRequestFetcher = (offer) => {
         setSelectedOffer(offer);
         setOrderForm({
@@ -324,7 +319,7 @@ export default function RequesterView({ client, user, setMessage }) {
 
                                     {order.payment_sent ? (
                                         <div className="flex items-center gap-2 rounded-lg bg-green-100 px-3 py-2 text-xs font-bold text-green-800">
-                                            <span>✓ Payment Details Sent (Txn: {order.txn_id})</span>
+                                            <span>✓ Payment Details Sent{order.txn_id && ` (Txn: ${order.txn_id})`}</span>
                                         </div>
                                     ) : (
                                         <form
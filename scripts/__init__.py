@@ -0,0 +1 @@
+"""Operational and performance tooling for YaarFetch. Run modules with `python -m scripts.<name>`."""
@@ -0,0 +1,97 @@
+"""
+Benchmark the order assignment solvers on synthetic data, no database needed.
+
+    python -m scripts.bench_assignment --orders 10000 --fetchers 10000
+    python -m scripts.bench_assignment --orders 50 --fetchers 50 --compare
+
+Prints solve time and match rate for the solver `solve()` would pick at that size.
+`--compare` also runs the other solver on the same input and reports the total score
+of both, to see how far greedy is from optimal.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from backend.app.assignment import _max_charge, score, solve, solve_greedy, solve_optimal
+
+from .seed_data import LOCATIONS
+
+
+def generate(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    locations = LOCATIONS[: args.locations]
+    fetchers = [ObjectId() for _ in range(args.fetchers)]
+    requesters = [ObjectId() for _ in range(max(args.orders // 2, 1))]
+    now = datetime.utcnow()
+
+    offers: List[Dict[str, Any]] = []
+    for fetcher in fetchers:
+        for _ in range(rng.randint(1, 2)):
+            offers.append(
+                {
+                    "_id": ObjectId(),
+                    "fetcher_id": fetcher,
+                    "destination": rng.choice(locations),
+                    "delivery_charge": rng.choice([None, 30, 50, 80, 100, 150]),
+                }
+            )
+
+    orders: List[Dict[str, Any]] = []
+    for i in range(args.orders):
+        order = {
+            "_id": ObjectId(),
+            "requester_id": rng.choice(requesters),
+            "dropoff_location": rng.choice(locations),
+            "target_fetcher_id": None,
+            "target_offer_id": None,
+            "created_at": now - timedelta(seconds=i),
+        }
+        if rng.random() < args.targeted_ratio:
+            offer = rng.choice(offers)
+            order["target_offer_id"] = offer["_id"]
+            order["target_fetcher_id"] = offer["fetcher_id"]
+        orders.append(order)
+    return orders, offers
+
+
+def report(name: str, orders, offers, pairs, seconds: float) -> None:
+    max_charge = _max_charge(offers)
+    total = sum(score(order, offer, max_charge) for order, offer in pairs)
+    rate = len(pairs) / len(orders) if orders else 0
+    print(f"{name:<10} solve={seconds * 1000:9.1f}ms matched={len(pairs):<7} match_rate={rate:.3f} score={total:.1f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--fetchers", type=int, default=10000)
+    parser.add_argument("--locations", type=int, default=len(LOCATIONS))
+    parser.add_argument("--targeted-ratio", type=float, default=0.1)
+    parser.add_argument("--compare", action="store_true", help="Run both solvers on the same input")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    orders, offers = generate(args)
+    print(f"{len(orders)} open orders, {args.fetchers} fetchers, {len(offers)} offers")
+
+    started = time.perf_counter()
+    algorithm, pairs = solve(orders, offers)
+    report(algorithm, orders, offers, pairs, time.perf_counter() - started)
+
+    if args.compare:
+        other, solver = ("greedy", solve_greedy) if algorithm == "hungarian" else ("hungarian", solve_optimal)
+        started = time.perf_counter()
+        pairs = solver(orders, offers)
+        report(other, orders, offers, pairs, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
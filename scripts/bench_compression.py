@@ -0,0 +1,149 @@
+"""
+Benchmark response compression: bytes on the wire and CPU per request.
+
+    python -m scripts.bench_compression --requests 200
+
+Serves the real routes from the in-memory engine: `GET /offers` returning --offers
+offers and `GET /chat/{id}/messages` returning --messages messages. Each route is
+requested four ways:
+- identity: no compression
+- compressed: compressed on every request, with COMPRESSION_CACHE_ROUTES emptied
+- cached: compressed bytes reused while the body is unchanged
+- revalidated: If-None-Match answered with 304
+
+Uses br when the brotli package is installed, otherwise gzip. Every mode must decode
+to the same JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+# Settings are read at import time, so configure before importing the app
+os.environ["STORAGE_ENGINE"] = "memory"
+os.environ["SERVER_TIMING_ENABLED"] = "false"
+os.environ["COMPRESSION_ENABLED"] = "true"
+
+import httpx  # noqa: E402
+
+from backend.app import compression  # noqa: E402
+from backend.app.dependencies import get_repos  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.app.repositories import MemoryStore, Repositories  # noqa: E402
+from backend.app.security import create_access_token  # noqa: E402
+
+
+async def seed(repos: Repositories, offers: int, messages: int):
+    now = datetime.utcnow()
+    requester = await repos.users.insert(
+        {"name": "Requester", "email": "requester@example.com", "phone_number": "03001234567", "created_at": now}
+    )
+    fetcher = await repos.users.insert(
+        {"name": "Fetcher", "email": "fetcher@example.com", "phone_number": "03007654321", "created_at": now}
+    )
+    for i in range(offers):
+        await repos.offers.insert(
+            {
+                "fetcher_id": fetcher["_id"],
+                "fetcher_name": fetcher["name"],
+                "current_location": "Library",
+                "destination": f"Hostel {i % 12}",
+                "arrival_time": "5:00 PM",
+                "pickup_capability": "Small parcels, food and stationery",
+                "contact_number": "03007654321",
+                "delivery_charge": 50 + i % 5 * 10,
+                "estimated_delivery_time": "20 min",
+                "created_at": now - timedelta(minutes=i),
+            }
+        )
+    order = await repos.orders.insert(
+        {
+            "item": "Tea",
+            "dropoff_location": "Library",
+            "requester_id": requester["_id"],
+            "fetcher_id": fetcher["_id"],
+            "status": "accepted",
+            "created_at": now,
+        }
+    )
+    for i in range(messages):
+        sender = requester if i % 2 else fetcher
+        await repos.chats.insert(
+            {
+                "order_id": order["_id"],
+                "sender_id": sender["_id"],
+                "sender_name": sender["name"],
+                "content": f"Message {i}: on my way, five minutes out",
+                "created_at": now + timedelta(seconds=i),
+            }
+        )
+    return requester, order
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers, requests: int):
+    response = await client.get(path, headers=headers)  # warm up
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+    cpu = (time.process_time() - cpu) / requests
+    wall = (time.perf_counter() - wall) / requests
+    return cpu, wall, response
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--offers", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=1000)
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    repos = Repositories(MemoryStore())
+    app.dependency_overrides[get_repos] = lambda: repos
+    requester, order = await seed(repos, args.offers, args.messages)
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': str(requester['_id'])})}"}
+    encoding = compression.negotiate("br, gzip")
+    cache_routes = compression.CACHE_ROUTES
+    print(f"encoding={encoding}")
+
+    mismatches = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        for name, path in (
+            (f"{args.offers} offers", "/offers"),
+            (f"{args.messages} messages", f"/chat/{order['_id']}/messages"),
+        ):
+            expected = None
+            for mode in ("identity", "compressed", "cached", "revalidated"):
+                headers = {**auth, "Accept-Encoding": "identity" if mode == "identity" else encoding}
+                compression.CACHE_ROUTES = [] if mode == "compressed" else cache_routes
+                if mode == "revalidated":
+                    etag = (await client.get(path, headers=headers)).headers["etag"]
+                    headers["If-None-Match"] = etag
+                cpu, wall, response = await measure(client, path, headers, args.requests)
+                # httpx decodes the body; the wire size is what the server sent
+                sent = len(response.read()) if mode == "identity" else int(response.headers.get("content-length", 0))
+                if mode != "revalidated":
+                    body = response.json()
+                    expected = body if expected is None else expected
+                    mismatches += body != expected
+                print(
+                    f"{name:<14} {mode:<12} status={response.status_code} bytes={sent:<7} "
+                    f"cpu={cpu * 1000:6.2f}ms wall={wall * 1000:6.2f}ms"
+                )
+    compression.CACHE_ROUTES = cache_routes
+    print(json.dumps(compression.compression_metrics()))
+    print("same output" if not mismatches else "OUTPUT DIFFERS")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
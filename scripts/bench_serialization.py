@@ -0,0 +1,122 @@
+"""
+Benchmark list response serialization: validated Pydantic models vs the orjson fast path.
+
+    python -m scripts.bench_serialization --requests 200
+
+Serves the real routes from the in-memory engine, so the numbers are the API's own CPU
+cost per request (auth, handler, serialization) without database round trips:
+`GET /orders` returning 100 enriched orders and `GET /chat/{id}/messages` returning
+1000 messages, each run with FAST_JSON_ENABLED off and on. Both modes must produce the
+same JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+# Settings are read at import time, so configure before importing the app
+os.environ["STORAGE_ENGINE"] = "memory"
+os.environ["SERVER_TIMING_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.dependencies import get_repos  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.app.repositories import MemoryStore, Repositories  # noqa: E402
+from backend.app.security import create_access_token  # noqa: E402
+
+
+async def seed(repos: Repositories, orders: int, messages: int):
+    now = datetime.utcnow()
+    requester = await repos.users.insert(
+        {"name": "Requester", "email": "requester@bench.local", "phone_number": "03001234567", "created_at": now}
+    )
+    fetcher = await repos.users.insert(
+        {"name": "Fetcher", "email": "fetcher@bench.local", "phone_number": "03007654321", "created_at": now}
+    )
+    order = None
+    for i in range(orders):
+        order = await repos.orders.insert(
+            {
+                "item": f"Item {i}",
+                "dropoff_location": "Library",
+                "instructions": "Leave at the front desk",
+                "requester_id": requester["_id"],
+                "fetcher_id": fetcher["_id"],
+                "target_offer_id": None,
+                "target_fetcher_id": None,
+                "status": "accepted",
+                "payment_sent": i % 2 == 0,
+                "created_at": now - timedelta(minutes=i),
+            }
+        )
+    for i in range(messages):
+        sender = requester if i % 2 else fetcher
+        await repos.chats.insert(
+            {
+                "order_id": order["_id"],
+                "sender_id": sender["_id"],
+                "sender_name": sender["name"],
+                "content": f"Message {i}: on my way, five minutes out",
+                "created_at": now + timedelta(seconds=i),
+            }
+        )
+    return requester, order
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers, requests: int):
+    await client.get(path, headers=headers)  # warm up
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+    cpu = (time.process_time() - cpu) / requests
+    wall = (time.perf_counter() - wall) / requests
+    return cpu, wall, response.content
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=1000)
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    repos = Repositories(MemoryStore())
+    app.dependency_overrides[get_repos] = lambda: repos
+    requester, order = await seed(repos, args.orders, args.messages)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(requester['_id'])})}"}
+
+    mismatches = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        for name, path in (
+            (f"{args.orders} orders", "/orders"),
+            (f"{args.messages} messages", f"/chat/{order['_id']}/messages"),
+        ):
+            results = {}
+            for fast in (False, True):
+                settings.fast_json_enabled = fast
+                results[fast] = await measure(client, path, headers, args.requests)
+            (slow_cpu, slow_wall, slow_body), (fast_cpu, fast_wall, fast_body) = results[False], results[True]
+            same = json.loads(slow_body) == json.loads(fast_body)
+            mismatches += not same
+            print(
+                f"{name:<14} validated cpu={slow_cpu * 1000:7.2f}ms wall={slow_wall * 1000:7.2f}ms | "
+                f"fast cpu={fast_cpu * 1000:7.2f}ms wall={fast_wall * 1000:7.2f}ms | "
+                f"saved {(slow_cpu - fast_cpu) * 1000:.2f}ms cpu/request ({slow_cpu / fast_cpu:.1f}x) "
+                f"bytes={len(fast_body)} {'same output' if same else 'OUTPUT DIFFERS'}"
+            )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,181 @@
+"""
+Check read routing and read-your-writes against a local three-node replica set.
+
+    python -m scripts.check_read_routing --start-replset
+    python -m scripts.check_read_routing --uri "mongodb://localhost:27117,localhost:27118,localhost:27119/?replicaSet=rs_yaarfetch"
+
+With --start-replset, three `mongod` processes (see --mongod) are started on scratch
+data directories, initiated as a replica set and torn down afterwards. The API then runs
+in-process against it. Each round accepts an order and immediately reads the fetcher
+dashboard, which is routed to secondaries, passing the X-Causal-Token from the accept.
+The accepted order must always be there. The same reads without the token are counted
+too, to show what the token is protecting against.
+
+Exits 1 if any causal read misses its own write or no read reached a secondary.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import List, Tuple
+
+from pymongo import MongoClient
+
+REPLSET = "rs_yaarfetch"
+
+
+def start_replset(mongod: str, base_port: int) -> Tuple[str, List[subprocess.Popen], str]:
+    workdir = tempfile.mkdtemp(prefix="yaarfetch-rs-")
+    ports = [base_port + i for i in range(3)]
+    processes = []
+    for port in ports:
+        dbpath = os.path.join(workdir, str(port))
+        os.makedirs(dbpath)
+        processes.append(
+            subprocess.Popen(
+                [mongod, "--replSet", REPLSET, "--port", str(port), "--dbpath", dbpath, "--bind_ip", "127.0.0.1"],
+                stdout=open(os.path.join(workdir, f"{port}.log"), "w"),
+                stderr=subprocess.STDOUT,
+            )
+        )
+
+    seed = MongoClient(f"mongodb://127.0.0.1:{ports[0]}/?directConnection=true", serverSelectionTimeoutMS=30000)
+    seed.admin.command(
+        "replSetInitiate",
+        {
+            "_id": REPLSET,
+            "members": [
+                {"_id": i, "host": f"127.0.0.1:{port}", "priority": 2 if i == 0 else 1}
+                for i, port in enumerate(ports)
+            ],
+        },
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        states = [m["stateStr"] for m in seed.admin.command("replSetGetStatus")["members"]]
+        if states.count("PRIMARY") == 1 and states.count("SECONDARY") == 2:
+            break
+        time.sleep(0.5)
+    else:
+        raise SystemExit(f"Replica set did not come up, see logs in {workdir}")
+    seed.close()
+    hosts = ",".join(f"127.0.0.1:{port}" for port in ports)
+    return f"mongodb://{hosts}/?replicaSet={REPLSET}", processes, workdir
+
+
+def secondary_queries(uri: str) -> int:
+    """Total query + getmore opcounters on the current secondaries."""
+    client = MongoClient(uri)
+    try:
+        total = 0
+        for member in client.admin.command("replSetGetStatus")["members"]:
+            if member["stateStr"] != "SECONDARY":
+                continue
+            node = MongoClient(f"mongodb://{member['name']}/?directConnection=true")
+            counters = node.admin.command("serverStatus")["opcounters"]
+            total += counters["query"] + counters["getmore"]
+            node.close()
+        return total
+    finally:
+        client.close()
+
+
+def sees_task(response, order_id: str) -> bool:
+    return response.status_code == 200 and order_id in {o["id"] for o in response.json()["my_tasks"]}
+
+
+async def run_rounds(rounds: int) -> Tuple[int, int]:
+    import httpx
+
+    from backend.app.main import app
+
+    stale_with_token = stale_without_token = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+
+        async def register(name: str):
+            response = await client.post(
+                "/auth/register",
+                json={"name": name, "email": f"{name}-{uuid.uuid4().hex[:8]}@example.com", "password": "secret123", "phone_number": "03001234567"},
+            )
+            response.raise_for_status()
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        requester = await register("requester")
+        fetcher = await register("fetcher")
+        for _ in range(rounds):
+            created = await client.post(
+                "/orders", json={"item": "Tea", "dropoff_location": "Library"}, headers=requester
+            )
+            created.raise_for_status()
+            order_id = created.json()["id"]
+            accepted = await client.post(f"/orders/{order_id}/accept", headers=fetcher)
+            accepted.raise_for_status()
+            token = accepted.headers["x-causal-token"]
+
+            plain, causal = await asyncio.gather(
+                client.get("/dashboard/fetcher", headers=fetcher),
+                client.get("/dashboard/fetcher", headers={**fetcher, "X-Causal-Token": token}),
+            )
+            # Without the token even the fetcher's own user lookup can miss on a lagging secondary
+            if not sees_task(causal, order_id):
+                stale_with_token += 1
+            if not sees_task(plain, order_id):
+                stale_without_token += 1
+    return stale_with_token, stale_without_token
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="Replica set URI; required unless --start-replset")
+    parser.add_argument("--start-replset", action="store_true")
+    parser.add_argument("--mongod", default=shutil.which("mongod") or "mongod")
+    parser.add_argument("--base-port", type=int, default=27117)
+    parser.add_argument("--db", default=f"yaarfetch_readcheck_{uuid.uuid4().hex[:6]}")
+    parser.add_argument("--rounds", type=int, default=100)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    processes: List[subprocess.Popen] = []
+    workdir = None
+    uri = args.uri
+    try:
+        if args.start_replset:
+            uri, processes, workdir = start_replset(args.mongod, args.base_port)
+        elif not uri:
+            raise SystemExit("--uri or --start-replset is required")
+
+        # Settings are read at import time, so configure before importing the app
+        os.environ["MONGO_URI"] = uri
+        os.environ["MONGO_DB_NAME"] = args.db
+        os.environ.setdefault("ROUTE_READ_PREFERENCES", "GET /dashboard=secondary")
+        os.environ["CAUSAL_SESSIONS_ENABLED"] = "true"
+
+        before = secondary_queries(uri)
+        stale_with_token, stale_without_token = asyncio.run(run_rounds(args.rounds))
+        on_secondaries = secondary_queries(uri) - before
+
+        print(f"rounds={args.rounds} secondary_queries={on_secondaries}")
+        print(f"missed own write with token:    {stale_with_token}")
+        print(f"missed own write without token: {stale_without_token}")
+        MongoClient(uri).drop_database(args.db)
+        return 1 if stale_with_token or not on_secondaries else 0
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Check that concurrent duplicate signups create exactly one account.
+
+    python -m scripts.check_signup_race
+    python -m scripts.check_signup_race --uri mongodb://localhost:27017 --signups 50
+
+Fires --signups registrations for the same address at once, each spelling it with
+different letter case, through the API in-process. Exactly one must get 201 and the rest
+400 "Email already registered". Login must then work with yet another spelling. Without
+--uri the API runs on the in-memory engine; with it, against a scratch database on that
+server, which is dropped afterwards.
+
+Exits 1 if more or fewer than one signup succeeded, or login fails.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from collections import Counter
+
+
+def spellings(email: str, count: int):
+    """`count` variants of `email` differing only in letter case."""
+    for i in range(count):
+        yield "".join(c.upper() if (i >> (n % 16)) & 1 else c for n, c in enumerate(email))
+
+
+async def run(signups: int) -> int:
+    import httpx
+
+    from backend.app.database import database
+    from backend.app.dependencies import repos_for
+    from backend.app.main import app
+
+    # ASGITransport doesn't run the lifespan, which is where the index is created
+    await repos_for(database.db).ensure_indexes()
+
+    email = f"race-{uuid.uuid4().hex[:8]}@example.com"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/auth/register",
+                    json={"name": "Racer", "email": spelling, "password": "secret123", "phone_number": "03001234567"},
+                )
+                for spelling in spellings(email, signups)
+            )
+        )
+        statuses = Counter(response.status_code for response in responses)
+        login = await client.post("/auth/login", json={"email": email.upper(), "password": "secret123"})
+
+    print(f"signups={signups} statuses={dict(statuses)} login={login.status_code}")
+    ok = statuses[201] == 1 and statuses[400] == signups - 1 and login.status_code == 200
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="Mongo URI; the in-memory engine is used without it")
+    parser.add_argument("--db", default=f"yaarfetch_signupcheck_{uuid.uuid4().hex[:6]}")
+    parser.add_argument("--signups", type=int, default=20)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    # Settings are read at import time, so configure before importing the app
+    if args.uri:
+        os.environ["MONGO_URI"] = args.uri
+        os.environ["MONGO_DB_NAME"] = args.db
+        os.environ["STORAGE_ENGINE"] = "mongo"
+        os.environ["CAUSAL_SESSIONS_ENABLED"] = "false"
+    else:
+        os.environ["STORAGE_ENGINE"] = "memory"
+    # Every signup is admitted at once rather than queued
+    os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", str(args.signups))
+    try:
+        return asyncio.run(run(args.signups))
+    finally:
+        if args.uri:
+            from pymongo import MongoClient
+
+            MongoClient(args.uri).drop_database(args.db)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
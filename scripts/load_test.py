@@ -0,0 +1,272 @@
+"""
+Load test the API with realistic user journeys; report throughput and per-route latency.
+
+    python -m scripts.load_test --concurrency 20 --iterations 10             # in-process, in-memory engine
+    python -m scripts.load_test --uri mongodb://localhost:27017 --db yaarfetch_load
+    python -m scripts.load_test --url http://localhost:8000 --out load.json  # a running server
+    python -m scripts.load_test --update                                     # record a baseline
+    python -m scripts.load_test                                              # compare, exit 1 on regression
+
+Each of --concurrency journeys is a requester and a fetcher who register, log in and
+check their profile. The fetcher posts an offer. Then, --iterations times: the requester
+places an order, the fetcher finds it in the open feed and dashboard and accepts it,
+they exchange messages while both poll the chat (--polls), and the order goes through
+picked_up and delivered while the requester checks the order and their dashboard.
+
+Needs httpx from requirements-dev.txt. Without --url the app runs in-process over
+httpx's ASGI transport (lifespan included), on the in-memory engine unless --uri is given. Latencies are keyed by route template, as
+in routes/*.py. --out writes the results as JSON. A route regresses when its p95 grows
+past the baseline's by more than --tolerance and --min-ms (routes with fewer than
+--min-count requests are too noisy to judge); latency depends on the machine, so record
+baselines and compare on the same one.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DEFAULT_BASELINE = Path(__file__).with_name("load_test.baseline.json")
+
+
+class JourneyError(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, method: str, route: str, path: str, **kwargs: Any):
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        self.latencies[f"{method} {route}"].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[f"{method} {route}"] += 1
+            raise JourneyError(f"{method} {path} -> {response.status_code} {response.text[:200]}")
+        return response.json() if response.content else None
+
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def register(rec: Recorder, client: httpx.AsyncClient, role: str) -> Dict[str, str]:
+    email = f"{role}-{uuid.uuid4().hex[:12]}@example.com"
+    await rec.call(
+        client,
+        "POST",
+        "/auth/register",
+        "/auth/register",
+        json={"name": role.title(), "email": email, "password": "secret123", "phone_number": "03001234567"},
+    )
+    login = await rec.call(client, "POST", "/auth/login", "/auth/login", json={"email": email, "password": "secret123"})
+    headers = _auth(login["access_token"])
+    await rec.call(client, "GET", "/auth/me", "/auth/me", headers=headers)
+    return headers
+
+
+async def journey(rec: Recorder, client: httpx.AsyncClient, iterations: int, polls: int) -> None:
+    requester = await register(rec, client, "requester")
+    fetcher = await register(rec, client, "fetcher")
+    offer = await rec.call(
+        client,
+        "POST",
+        "/offers",
+        "/offers",
+        headers=fetcher,
+        json={
+            "current_location": "Library",
+            "destination": "Hostel 3",
+            "arrival_time": "5:00 PM",
+            "pickup_capability": "Small parcels",
+            "contact_number": "03007654321",
+            "delivery_charge": 50,
+            "estimated_delivery_time": "20 min",
+        },
+    )
+    await rec.call(client, "GET", "/offers", "/offers", headers=requester)
+
+    for i in range(iterations):
+        order = await rec.call(
+            client,
+            "POST",
+            "/orders",
+            "/orders",
+            headers=requester,
+            json={"item": f"Tea #{i}", "dropoff_location": "Hostel 3", "target_offer_id": offer["id"]},
+        )
+        order_path = f"/orders/{order['id']}"
+        chat_path = f"/chat/{order['id']}/messages"
+        await rec.call(client, "GET", "/orders", "/orders", headers=fetcher, params={"status_filter": "open"})
+        await rec.call(client, "GET", "/dashboard/fetcher", "/dashboard/fetcher", headers=fetcher)
+        await rec.call(client, "POST", "/orders/{order_id}/accept", f"{order_path}/accept", headers=fetcher)
+
+        for sender, content in ((requester, "Hi, is it on the way?"), (fetcher, "Picking it up now")):
+            await rec.call(client, "POST", "/chat/{order_id}/messages", chat_path, headers=sender, json={"content": content})
+            for _ in range(polls):
+                for reader in (requester, fetcher):
+                    await rec.call(client, "GET", "/chat/{order_id}/messages", chat_path, headers=reader)
+
+        for new_status in ("picked_up", "delivered"):
+            await rec.call(
+                client, "PATCH", "/orders/{order_id}/status", f"{order_path}/status", headers=fetcher, json={"status": new_status}
+            )
+            await rec.call(client, "GET", "/orders/{order_id}", order_path, headers=requester)
+        await rec.call(client, "GET", "/dashboard/requester", "/dashboard/requester", headers=requester)
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    # Nearest rank
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(rec: Recorder, wall: float) -> Dict[str, Dict[str, Any]]:
+    routes = {}
+    for route, latencies in sorted(rec.latencies.items()):
+        ordered = sorted(latencies)
+        routes[route] = {
+            "count": len(ordered),
+            "errors": rec.errors.get(route, 0),
+            "rps": round(len(ordered) / wall, 1),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+    return routes
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], args) -> List[str]:
+    problems = []
+    for route, current in results["routes"].items():
+        base = baseline["routes"].get(route)
+        if base is None:
+            print(f"{route}: not in baseline, skipped")
+            continue
+        if current["errors"] > base["errors"]:
+            problems.append(f"{route}: {current['errors']} errors (baseline {base['errors']})")
+        if current["count"] < args.min_count:
+            continue
+        limit = base["p95_ms"] * (1 + args.tolerance)
+        if current["p95_ms"] > limit and current["p95_ms"] - base["p95_ms"] >= args.min_ms:
+            problems.append(f"{route}: p95 {current['p95_ms']}ms > {limit:.2f}ms (baseline {base['p95_ms']}ms)")
+    return problems
+
+
+@contextlib.asynccontextmanager
+async def make_client(args):
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            yield client, "http"
+        return
+
+    # Settings are read at import time, so configure before importing the app
+    if args.uri:
+        os.environ["MONGO_URI"] = args.uri
+        os.environ["MONGO_DB_NAME"] = args.db
+        os.environ["STORAGE_ENGINE"] = "mongo"
+    else:
+        os.environ["STORAGE_ENGINE"] = "memory"
+    from backend.app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as client:
+            yield client, "asgi-mongo" if args.uri else "asgi-memory"
+
+
+async def run(args) -> int:
+    rec = Recorder()
+    async with make_client(args) as (client, mode):
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(journey(rec, client, args.iterations, args.polls) for _ in range(args.concurrency)),
+            return_exceptions=True,
+        )
+        wall = time.perf_counter() - started
+
+    failed = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    for failure in failed[:5]:
+        print(f"journey failed: {failure!r}")
+    total = sum(len(latencies) for latencies in rec.latencies.values())
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "mode": mode,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "polls": args.polls,
+            "seconds": round(wall, 2),
+            "requests": total,
+            "rps": round(total / wall, 1),
+            "failed_journeys": len(failed),
+        },
+        "routes": summarize(rec, wall),
+    }
+
+    print(f"{mode}: {total} requests in {wall:.1f}s = {results['meta']['rps']} req/s, {len(failed)} failed journeys")
+    print(f"{'route':<34} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for route, stats in results["routes"].items():
+        print(
+            f"{route:<34} {stats['count']:>6} {stats['errors']:>4} {stats['p50_ms']:>8} "
+            f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}"
+        )
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+    if args.update:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 1 if failed else 0
+    if not args.baseline.exists():
+        return 1 if failed else 0
+
+    problems = compare(json.loads(args.baseline.read_text()), results, args)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems or failed else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--uri", help="Mongo URI for the in-process app; the in-memory engine when omitted")
+    parser.add_argument("--db", default=f"yaarfetch_load_{uuid.uuid4().hex[:6]}")
+    parser.add_argument("--concurrency", type=int, default=20, help="Journeys running at once")
+    parser.add_argument("--iterations", type=int, default=10, help="Orders per journey")
+    parser.add_argument("--polls", type=int, default=3, help="Chat polls per participant per message")
+    parser.add_argument("--out", type=Path, help="Write this run's results as JSON")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth of p95")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="Ignore p95 growth below this many ms")
+    parser.add_argument("--min-count", type=int, default=20, help="Don't compare routes with fewer requests")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,66 @@
+"""
+Move payment and payout fields off order documents into the `payouts` collection.
+
+    python -m scripts.migrate_payouts --db yaarfetch [--batch-size 1000] [--dry-run]
+
+Safe to re-run: payouts are upserted by order _id, fields already present in `payouts`
+win over the legacy copy, and orders are only unset after their payout is written.
+`payment_sent` and `payout_status` stay on the order as listing flags.
+"""
+
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from backend.app.config import settings
+from backend.app.utils import PAYOUT_FIELDS, legacy_inline_fields
+
+
+async def migrate(db, batch_size: int, dry_run: bool) -> int:
+    legacy = {"$or": [{field: {"$exists": True}} for field in PAYOUT_FIELDS]}
+    projection = {field: 1 for field in PAYOUT_FIELDS}
+    moved = 0
+    while True:
+        orders = await db.orders.find(legacy, projection).limit(batch_size).to_list(length=batch_size)
+        if not orders:
+            return moved
+        if dry_run:
+            return await db.orders.count_documents(legacy)
+
+        payout_ops = []
+        for order in orders:
+            fields = legacy_inline_fields(order)
+            if fields:
+                # Pipeline update so a field already in `payouts` is left alone
+                merge = {f: {"$ifNull": [f"${f}", {"$literal": v}]} for f, v in fields.items()}
+                payout_ops.append(UpdateOne({"_id": order["_id"]}, [{"$set": merge}], upsert=True))
+        if payout_ops:
+            await db.payouts.bulk_write(payout_ops, ordered=False)
+        await db.orders.update_many(
+            {"_id": {"$in": [order["_id"] for order in orders]}},
+            {"$unset": {field: "" for field in PAYOUT_FIELDS}},
+        )
+        moved += len(orders)
+        print(f"moved {moved} orders")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=settings.mongo_uri)
+    parser.add_argument("--db", required=True, help="Database to migrate, named explicitly")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Only count orders that still need moving")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.uri)
+    try:
+        count = await migrate(client[args.db], args.batch_size, args.dry_run)
+        print(f"{count} orders {'to move' if args.dry_run else 'moved'}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Payload check for every route driven by scripts/route_queries.py: each read it issues
+must use a projection from backend/app/projections.py, and the serialized response body
+must stay within the baseline's size for that route.
+
+    python -m scripts.payload_budget --db yaarfetch_bench --update   # record a baseline
+    python -m scripts.payload_budget --db yaarfetch_bench            # compare, exit 1 on failure
+
+Bodies are measured as the app serialized them (no compression) by requesting each
+route through the ASGI app. Sizes depend on the data, so record and compare against
+databases seeded the same way (the committed baseline used seed_data's defaults).
+Exits 1 when a query has no projection or an inline one, or a route's body grew past
+the tolerance, which usually means a projection grew or a route stopped using one.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.app.config import settings
+
+from .route_queries import drive_routes, projection_name
+
+DEFAULT_BASELINE = Path(__file__).with_name("payload_budget.baseline.json")
+
+
+async def run(args) -> int:
+    client = AsyncIOMotorClient(args.uri)
+    try:
+        sample = await drive_routes(client[args.db], args.password)
+    finally:
+        client.close()
+
+    failures = []
+    for query in sample.queries:
+        projection = projection_name(query.projection)
+        if projection in ("no_projection", "inline_projection"):
+            failures.append(f"{query.name}: {projection.replace('_', ' ')}")
+
+    if args.update:
+        args.baseline.write_text(json.dumps(sample.response_bytes, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update first")
+        return 1
+    else:
+        baseline = json.loads(args.baseline.read_text())
+        for route, size in sample.response_bytes.items():
+            budget = baseline.get(route)
+            if budget is None:
+                print(f"{route}: not in baseline, skipped")
+                continue
+            limit = budget * (1 + args.tolerance)
+            status = "ok"
+            if size > limit:
+                status = f"OVER BUDGET ({limit:.0f})"
+                failures.append(f"{route}: {size} bytes > {limit:.0f} (baseline {budget})")
+            print(f"{route:<45} bytes={size:<8} baseline={budget:<8} {status}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=settings.mongo_uri)
+    parser.add_argument("--db", required=True, help="A seeded benchmark database, not the app's")
+    parser.add_argument("--password", default="password123", help="seed_data's --password, for the login route")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update", action="store_true", help="Record the current body sizes as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative growth of a body")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,122 @@
+"""
+Query-plan regression check for every read the routes issue, as recorded by driving
+them in scripts/route_queries.py.
+
+    python -m scripts.query_plans --db yaarfetch_bench --update   # record a baseline
+    python -m scripts.query_plans --db yaarfetch_bench            # compare, exit 1 on regression
+
+For each query it records the winning plan (stage chain and index), keys and docs
+examined, and the docs-examined ratio (docs examined per doc returned). A query
+regresses when it picks up a COLLSCAN or in-memory SORT the baseline didn't have, or
+when its ratio grows past the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.app.config import settings
+
+from .route_queries import sample_route_queries
+
+DEFAULT_BASELINE = Path(__file__).with_name("query_plans.baseline.json")
+BAD_STAGES = {"COLLSCAN", "SORT"}
+
+
+def _stage_chain(plan: Dict[str, Any]) -> List[str]:
+    # Servers running the SBE engine nest the classic plan under "queryPlan"
+    plan = plan.get("queryPlan", plan)
+    chain = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage}({plan['indexName']})"
+        chain.append(stage)
+        inputs = plan.get("inputStages") or []
+        plan = plan.get("inputStage") or (inputs[0] if inputs else None)
+    return chain
+
+
+def summarize(explain: Dict[str, Any]) -> Dict[str, Any]:
+    chain = _stage_chain(explain["queryPlanner"]["winningPlan"])
+    stats = explain.get("executionStats", {})
+    returned = stats.get("nReturned", 0)
+    docs = stats.get("totalDocsExamined", 0)
+    return {
+        "plan": " > ".join(chain),
+        "stages": sorted({stage.split("(")[0] for stage in chain}),
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "docs_examined": docs,
+        "returned": returned,
+        "docs_examined_ratio": round(docs / max(returned, 1), 2),
+    }
+
+
+def compare(name: str, base: Optional[Dict[str, Any]], current: Dict[str, Any], args) -> List[str]:
+    if base is None:
+        return []
+    problems = []
+    new_bad = (BAD_STAGES & set(current["stages"])) - set(base["stages"])
+    if new_bad:
+        problems.append(f"{name}: plan gained {', '.join(sorted(new_bad))} ({base['plan']} -> {current['plan']})")
+    limit = base["docs_examined_ratio"] * (1 + args.tolerance)
+    if current["docs_examined"] >= args.min_docs and current["docs_examined_ratio"] > limit:
+        problems.append(
+            f"{name}: docs examined ratio {current['docs_examined_ratio']} > {limit:.2f} "
+            f"(baseline {base['docs_examined_ratio']})"
+        )
+    return problems
+
+
+async def run(args) -> int:
+    client = AsyncIOMotorClient(args.uri)
+    try:
+        db = client[args.db]
+        results = {}
+        for query in await sample_route_queries(db, args.password):
+            explain = await query.cursor(db).explain()
+            results[query.name] = {"route": query.route, **summarize(explain)}
+    finally:
+        client.close()
+
+    for name, result in results.items():
+        print(f"{name:<60} ratio={result['docs_examined_ratio']:<8} {result['plan']}")
+
+    if args.update:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update first")
+        return 1
+    baseline = json.loads(args.baseline.read_text())
+    problems = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name}: not in baseline, skipped")
+        problems.extend(compare(name, baseline.get(name), result, args))
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=settings.mongo_uri)
+    parser.add_argument("--db", required=True, help="A seeded benchmark database, not the app's")
+    parser.add_argument("--password", default="password123", help="seed_data's --password, for the login route")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update", action="store_true", help="Record the current plans as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative growth of the ratio")
+    parser.add_argument("--min-docs", type=int, default=100, help="Ignore ratio changes below this many docs examined")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,194 @@
+"""
+Catalog of the Mongo reads the routes issue, recorded by driving the real routes
+against a live (usually seeded) database, along with the size of each route's response
+body. Used by scripts/query_plans.py and scripts/payload_budget.py.
+
+Every request in `route_requests` goes through the app with repositories on a
+`RecordingStore`. The store notes each find/find_one the repository layer sends and
+refuses writes, so the database is left as it was. Routes that change data are driven
+as a user who may not change that order or offer, or for one that doesn't exist. That
+runs the reads in front of the permission check and stops there.
+
+A query is named after the first route that issued it, its collection and the
+projection it used (its name in projections.py). The same read issued again by a later
+route isn't listed twice.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from backend.app import projections
+from backend.app.database import database
+from backend.app.dependencies import get_repos
+from backend.app.main import app
+from backend.app.repositories import MotorStore, Repositories
+from backend.app.repositories.stores import MotorCollection
+from backend.app.security import create_access_token
+
+PROJECTIONS = [(name, value) for name, value in vars(projections).items() if name.isupper() and isinstance(value, dict)]
+
+
+@dataclass
+class RouteQuery:
+    name: str
+    route: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[tuple]] = None
+    limit: int = 0
+    projection: Optional[Dict[str, Any]] = None
+    collation: Optional[Dict[str, Any]] = None
+
+    def cursor(self, db: AsyncIOMotorDatabase):
+        cursor = db[self.collection].find(self.filter, self.projection, collation=self.collation)
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        if self.limit:
+            cursor = cursor.limit(self.limit)
+        return cursor
+
+
+def projection_name(projection: Optional[Dict[str, Any]]) -> str:
+    if projection is None:
+        return "no_projection"
+    return next((name for name, value in PROJECTIONS if value == projection), "inline_projection")
+
+
+def _shape(value: Any) -> Any:
+    # Filters that differ only in their values (ids, emails) run the same plan
+    if isinstance(value, dict):
+        return tuple(sorted((key, _shape(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(sorted({repr(_shape(item)) for item in value})))
+    return type(value).__name__
+
+
+class RecordingCollection(MotorCollection):
+    """A MotorCollection that reports its reads to the store and refuses writes."""
+
+    def __init__(self, collection, store: "RecordingStore") -> None:
+        super().__init__(collection)
+        self.store = store
+
+    async def find_one(self, filter, projection=None, collation=None):
+        self.store.record(self.collection.name, filter, projection, None, 1, collation)
+        return await super().find_one(filter, projection, collation)
+
+    async def find(self, filter, projection=None, sort=None, limit=0, collation=None):
+        self.store.record(self.collection.name, filter, projection, sort, limit, collation)
+        return await super().find(filter, projection, sort, limit, collation)
+
+    async def _refuse(self, *args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError(f"{self.store.route} tried to write to {self.collection.name} while being recorded")
+
+    insert_one = insert_many = find_one_and_update = update_one = bulk_update = delete_one = _refuse
+    create_index = _refuse
+
+
+class RecordingStore(MotorStore):
+    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+        super().__init__(db)
+        self.route = ""
+        self.queries: List[RouteQuery] = []
+        self._seen: set = set()
+
+    def collection(self, name: str) -> RecordingCollection:
+        return RecordingCollection(self.db[name], self)
+
+    def record(self, collection, filter, projection, sort, limit, collation) -> None:
+        sort = list(sort) if sort else None
+        key = (collection, _shape(filter), projection_name(projection), repr(sort), limit, repr(collation))
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        name = f"{self.route} {collection}.{projection_name(projection)}"
+        taken = sum(1 for query in self.queries if query.name.partition(" #")[0] == name)
+        if taken:
+            name = f"{name} #{taken + 1}"
+        self.queries.append(RouteQuery(name, self.route, collection, filter, sort, limit, projection, collation))
+
+
+@dataclass
+class RouteSample:
+    queries: List[RouteQuery]
+    # Serialized (uncompressed) response body bytes, by route
+    response_bytes: Dict[str, int]
+
+
+def route_requests(order_id: str, offer_id: str, email: str, password: str) -> List[Tuple[str, str, str, str, Any]]:
+    """(route, user, method, url, json body); `stranger` takes part in neither the order nor the offer."""
+    missing = str(ObjectId())
+    return [
+        ("POST /auth/login", "", "POST", "/auth/login", {"email": email, "password": password}),
+        ("GET /auth/me", "requester", "GET", "/auth/me", None),
+        ("GET /orders", "requester", "GET", "/orders", None),
+        ("GET /orders?status_filter=open", "fetcher", "GET", "/orders?status_filter=open", None),
+        ("GET /orders?status_filter=delivered", "requester", "GET", "/orders?status_filter=delivered", None),
+        ("GET /orders/{id}", "requester", "GET", f"/orders/{order_id}", None),
+        ("GET /orders/{id}/timeline", "requester", "GET", f"/orders/{order_id}/timeline", None),
+        ("PATCH /orders/{id}/status", "stranger", "PATCH", f"/orders/{order_id}/status", {"status": "picked_up"}),
+        (
+            "PATCH /orders/bulk/status",
+            "stranger",
+            "PATCH",
+            "/orders/bulk/status",
+            {"items": [{"order_id": order_id, "status": "picked_up"}]},
+        ),
+        ("PUT /orders/{id}/confirm-payout", "stranger", "PUT", f"/orders/{missing}/confirm-payout", {"total_amount": 1}),
+        ("GET /offers", "requester", "GET", "/offers", None),
+        ("PATCH /offers/{id}", "stranger", "PATCH", f"/offers/{offer_id}", {"destination": "Library"}),
+        ("DELETE /offers/{id}", "stranger", "DELETE", f"/offers/{offer_id}", None),
+        ("GET /chat/{id}/messages", "requester", "GET", f"/chat/{order_id}/messages", None),
+        ("POST /chat/{id}/messages", "stranger", "POST", f"/chat/{order_id}/messages", {"content": "Hello"}),
+        ("GET /dashboard/requester", "requester", "GET", "/dashboard/requester", None),
+        ("GET /dashboard/fetcher", "fetcher", "GET", "/dashboard/fetcher", None),
+    ]
+
+
+async def drive_routes(db: AsyncIOMotorDatabase, password: str = "password123") -> RouteSample:
+    order = await db.orders.find_one({"fetcher_id": {"$ne": None}}, {"requester_id": 1, "fetcher_id": 1})
+    offer = await db.offers.find_one({}, {"fetcher_id": 1})
+    if not order or not offer:
+        raise SystemExit("Seed the database first (python -m scripts.seed_data)")
+    requester = await db.users.find_one({"_id": order["requester_id"]}, {"email": 1})
+    stranger = await db.users.find_one(
+        {"_id": {"$nin": [order["requester_id"], order["fetcher_id"], offer["fetcher_id"]]}}, {"_id": 1}
+    )
+    if not requester or not stranger:
+        raise SystemExit("Seed the database first (python -m scripts.seed_data)")
+    users = {"requester": order["requester_id"], "fetcher": order["fetcher_id"], "stranger": stranger["_id"]}
+    tokens = {role: create_access_token({"sub": str(user_id)}) for role, user_id in users.items()}
+
+    store = RecordingStore(db)
+    repos = Repositories(store)
+    response_bytes: Dict[str, int] = {}
+    # Causal sessions (when enabled) must come from the client the reads go through
+    saved = database.client, database.db
+    database.client, database.db = db.client, db
+    app.dependency_overrides[get_repos] = lambda: repos
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            requests = route_requests(str(order["_id"]), str(offer["_id"]), requester["email"], password)
+            for route, user, method, url, body in requests:
+                store.route = route
+                # identity: measure the body the route serialized, not what compression made of it
+                headers = {"Accept-Encoding": "identity"}
+                if user:
+                    headers["Authorization"] = f"Bearer {tokens[user]}"
+                response = await client.request(method, url, headers=headers, json=body)
+                if response.status_code >= 500:
+                    raise SystemExit(f"{route} failed with {response.status_code}: {response.text}")
+                response_bytes[route] = len(response.content)
+    finally:
+        app.dependency_overrides.pop(get_repos, None)
+        database.client, database.db = saved
+    return RouteSample(store.queries, response_bytes)
+
+
+async def sample_route_queries(db: AsyncIOMotorDatabase, password: str = "password123") -> List[RouteQuery]:
+    return (await drive_routes(db, password)).queries
@@ -0,0 +1,244 @@
+"""
+Generate synthetic YaarFetch data at realistic volume.
+
+    python -m scripts.seed_data --db yaarfetch_bench --users 100000 --orders 1000000 --messages 10000000 --drop
+
+Documents have the same shape the routes write. Everything is inserted with unordered
+insert_many batches, several batches in flight at once. Orders are generated one batch
+at a time together with their payouts and chats, so memory stays bounded by
+--batch-size and --concurrency rather than by --orders or --messages.
+
+--db has no default, and --drop refuses the app's own database (MONGO_DB_NAME), so a
+benchmark run can't wipe real data.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from backend.app.config import settings
+from backend.app.security import get_password_hash
+
+LOCATIONS = [
+    "Hostel 1", "Hostel 2", "Hostel 3", "Hostel 4", "Girls Hostel", "Library",
+    "Main Gate", "Cafeteria", "Sports Complex", "Admin Block", "CS Department",
+    "EE Department", "Mosque", "Medical Center", "Market", "Bus Stop",
+]
+ITEMS = [
+    "Chips", "Cold drink", "Printouts", "Charger", "Notebook", "Biryani", "Shawarma",
+    "Medicine", "Tea", "Groceries", "Stationery", "Parcel", "Fries", "Water bottle",
+]
+STATUS_WEIGHTS = {"open": 0.2, "accepted": 0.1, "picked_up": 0.1, "delivered": 0.6}
+MESSAGES = [
+    "On my way", "Reached the gate", "Which room?", "Thanks!", "Picked it up",
+    "Can you add a drink?", "Running 5 minutes late", "Done, sent the payment",
+]
+
+
+class Seeder:
+    def __init__(self, db: AsyncIOMotorDatabase, args: argparse.Namespace) -> None:
+        self.db = db
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow()
+        self.user_ids: List[ObjectId] = []
+        self.user_names: Dict[ObjectId, str] = {}
+        self._inflight = asyncio.Semaphore(args.concurrency)
+        self._pending: List[asyncio.Task] = []
+
+    def _past(self, days: int = 90) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    async def _insert(self, collection: str, docs: List[Dict[str, Any]]) -> None:
+        try:
+            await self.db[collection].insert_many(docs, ordered=False)
+        finally:
+            self._inflight.release()
+
+    async def _flush(self, collection: str, batch: List[Dict[str, Any]]) -> None:
+        # Waiting for a slot here keeps at most --concurrency batches in memory
+        await self._inflight.acquire()
+        self._pending = [task for task in self._pending if not task.done()]
+        self._pending.append(asyncio.create_task(self._insert(collection, batch)))
+
+    async def _bulk(self, collection: str, docs: Iterable[Dict[str, Any]]) -> int:
+        """Queue `docs` as insert_many batches; returns how many there were."""
+        batch: List[Dict[str, Any]] = []
+        count = 0
+        for doc in docs:
+            batch.append(doc)
+            count += 1
+            if len(batch) >= self.args.batch_size:
+                await self._flush(collection, batch)
+                batch = []
+        if batch:
+            await self._flush(collection, batch)
+        return count
+
+    async def _finish(self, started: float, counts: Dict[str, int]) -> None:
+        await asyncio.gather(*self._pending)
+        self._pending = []
+        elapsed = time.perf_counter() - started
+        for collection, total in counts.items():
+            print(f"{collection}: {total} docs in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f}/s)")
+
+    async def _seed(self, collection: str, docs: Iterator[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        await self._finish(started, {collection: await self._bulk(collection, docs)})
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        # bcrypt is slow on purpose; every seeded user shares one hash of --password
+        password = get_password_hash(self.args.password)
+        for i in range(self.args.users):
+            oid = ObjectId()
+            self.user_ids.append(oid)
+            self.user_names[oid] = f"User {i}"
+            yield {
+                "_id": oid,
+                "name": self.user_names[oid],
+                "email": f"user{i}@seed.example.com",  # EmailStr rejects reserved TLDs like .test
+                "phone_number": f"03{self.rng.randint(0, 10**9 - 1):09d}",
+                "password": password,
+                "created_at": self._past(365),
+            }
+
+    def offers(self) -> Iterator[Dict[str, Any]]:
+        for _ in range(self.args.offers):
+            yield {
+                "_id": ObjectId(),
+                "fetcher_id": self.rng.choice(self.user_ids),
+                "current_location": self.rng.choice(LOCATIONS),
+                "destination": self.rng.choice(LOCATIONS),
+                "arrival_time": f"{self.rng.randint(1, 12)}:00 PM",
+                "pickup_capability": "Small items",
+                "contact_number": f"03{self.rng.randint(0, 10**9 - 1):09d}",
+                "delivery_charge": float(self.rng.choice([30, 50, 80, 100, 150])),
+                "estimated_delivery_time": f"{self.rng.randint(10, 60)} mins",
+                "notes": None,
+                "created_at": self._past(30),
+            }
+
+    def order(self) -> Dict[str, Any]:
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        requester_id = self.rng.choice(self.user_ids)
+        status = self.rng.choices(statuses, weights)[0]
+        targeted = self.rng.random() < self.args.targeted_ratio
+        target_fetcher_id = self.rng.choice(self.user_ids) if targeted else None
+        fetcher_id = None
+        if status != "open":
+            fetcher_id = target_fetcher_id or self.rng.choice(self.user_ids)
+
+        doc: Dict[str, Any] = {
+            "_id": ObjectId(),
+            "item": self.rng.choice(ITEMS),
+            "dropoff_location": self.rng.choice(LOCATIONS),
+            "instructions": None,
+            "requester_id": requester_id,
+            "fetcher_id": fetcher_id,
+            "target_offer_id": None,
+            "target_fetcher_id": target_fetcher_id,
+            "status": status,
+            "created_at": self._past(),
+        }
+        if status == "delivered":
+            doc["payment_sent"] = True
+            doc["payout_status"] = self.rng.choice(["PENDING", "PAID"])
+        return doc
+
+    def payout(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        payout = {
+            "_id": order["_id"],
+            "txn_id": f"TX{self.rng.randint(10**8, 10**9)}",
+            "paid_to_platform": True,
+            "fetcher_bank_name": "Seed Bank",
+            "fetcher_account_number": str(self.rng.randint(10**9, 10**10)),
+            "fetcher_account_title": "Seed Fetcher",
+            "updated_at": order["created_at"],
+        }
+        if order["payout_status"] == "PAID":
+            total = float(self.rng.choice([100, 200, 400]))
+            payout["platform_fee"] = total * 0.25
+            payout["fetcher_paid_amount"] = total * 0.75
+        return payout
+
+    def chats(self, matched: List[Dict[str, Any]], count: int) -> Iterator[Dict[str, Any]]:
+        # Only matched orders (with a fetcher) carry chats
+        if not matched:
+            return
+        for _ in range(count):
+            order = self.rng.choice(matched)
+            sender_id = self.rng.choice((order["requester_id"], order["fetcher_id"]))
+            yield {
+                "_id": ObjectId(),
+                "order_id": order["_id"],
+                "sender_id": sender_id,
+                "sender_name": self.user_names[sender_id],
+                "content": self.rng.choice(MESSAGES),
+                "created_at": order["created_at"] + timedelta(seconds=self.rng.randint(1, 86400)),
+            }
+
+    async def seed_orders(self) -> None:
+        started = time.perf_counter()
+        counts = {"orders": 0, "payouts": 0, "chats": 0}
+        total, messages = self.args.orders, self.args.messages
+        for start in range(0, total, self.args.batch_size):
+            end = min(start + self.args.batch_size, total)
+            orders = [self.order() for _ in range(end - start)]
+            counts["orders"] += await self._bulk("orders", orders)
+            counts["payouts"] += await self._bulk(
+                "payouts", [self.payout(order) for order in orders if order["status"] == "delivered"]
+            )
+            # This batch's share of --messages
+            share = messages * end // total - messages * start // total
+            matched = [order for order in orders if order["fetcher_id"] is not None]
+            counts["chats"] += await self._bulk("chats", self.chats(matched, share))
+        await self._finish(started, counts)
+
+    async def run(self) -> None:
+        if self.args.drop:
+            for name in ("users", "offers", "orders", "payouts", "chats"):
+                await self.db[name].drop()
+        await self._seed("users", self.users())
+        await self._seed("offers", self.offers())
+        await self.seed_orders()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=settings.mongo_uri)
+    parser.add_argument("--db", required=True, help="Benchmark database to fill")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--offers", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--targeted-ratio", type=float, default=0.1, help="Share of orders aimed at one fetcher")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many batches in flight")
+    parser.add_argument("--password", default="password123", help="Password for every seeded user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Drop the collections first")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    if args.users < 1:
+        raise SystemExit("--users must be at least 1")
+    if args.drop and args.db == settings.mongo_db_name:
+        raise SystemExit(f"Refusing to --drop {args.db!r}, the app's database (MONGO_DB_NAME)")
+    client = AsyncIOMotorClient(args.uri)
+    try:
+        await Seeder(client[args.db], args).run()
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())